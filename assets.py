@@ -0,0 +1,143 @@
+"""Frames of the game packed to one bundle file.
+
+The bundle starts with a JSON index line: modification times of source
+files and positions of sprite groups, one group per folder in `frames`.
+Every group is a JSON list of parsed sprites. The bundle is memory-mapped,
+a group is parsed only when it is requested for the first time.
+The bundle is rebuilt when source files are added, removed or changed.
+"""
+import json
+import mmap
+import os
+
+from sprites import Sprite
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FRAMES_DIR = os.path.join(BASE_DIR, 'frames')
+BUNDLE_PATH = os.path.join(BASE_DIR, 'frames.bundle')
+BUNDLE_VERSION = 1
+
+
+def get_sources(frames_dir=FRAMES_DIR):
+    """Return dict: source file path relative to frames_dir
+    — its modification time, in a stable order."""
+
+    sources = {}
+    for group_entry in sorted(os.scandir(frames_dir), key=_get_name):
+        if not group_entry.is_dir():
+            continue
+        for file_entry in sorted(os.scandir(group_entry.path), key=_get_name):
+            if not file_entry.is_file():
+                continue
+            source_path = f'{group_entry.name}/{file_entry.name}'
+            sources[source_path] = file_entry.stat().st_mtime_ns
+    return sources
+
+
+def _get_name(entry):
+    return entry.name
+
+
+def _dump_sprite(sprite):
+    return {
+        'text': sprite.text,
+        'rows': sprite.rows,
+        'rows_size': sprite.rows_size,
+        'columns_size': sprite.columns_size,
+        'runs': sprite.runs,
+    }
+
+
+def _load_sprite(sprite_data):
+    return Sprite.from_geometry(
+        sprite_data['text'],
+        sprite_data['rows'],
+        sprite_data['rows_size'],
+        sprite_data['columns_size'],
+        [tuple(run) for run in sprite_data['runs']],
+    )
+
+
+def build_bundle(
+    sources,
+    frames_dir=FRAMES_DIR,
+    bundle_path=BUNDLE_PATH
+):
+    groups_payloads = {}
+    for source_path in sources:
+        group_name = source_path.split('/')[0]
+        with open(os.path.join(frames_dir, source_path), 'r') as frame_file:
+            sprite = Sprite(frame_file.read())
+        groups_payloads.setdefault(group_name, []).append(
+            _dump_sprite(sprite)
+        )
+
+    payloads = []
+    groups = {}
+    offset = 0
+    for group_name, sprites_data in groups_payloads.items():
+        payload = json.dumps(sprites_data).encode()
+        groups[group_name] = [offset, len(payload)]
+        payloads.append(payload)
+        offset += len(payload)
+
+    index = {
+        'version': BUNDLE_VERSION,
+        'sources': sources,
+        'groups': groups,
+    }
+    temporary_path = f'{bundle_path}.tmp'
+    with open(temporary_path, 'wb') as bundle_file:
+        bundle_file.write(json.dumps(index).encode() + b'\n')
+        for payload in payloads:
+            bundle_file.write(payload)
+    os.replace(temporary_path, bundle_path)
+
+
+class FramesBundle:
+    """Memory-mapped bundle, `get_group` returns sprites of a folder."""
+
+    def __init__(self, bundle_path=BUNDLE_PATH):
+        with open(bundle_path, 'rb') as bundle_file:
+            self._data = mmap.mmap(
+                bundle_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        index_end = self._data.find(b'\n')
+        self.index = json.loads(self._data[:index_end])
+        self._payloads_start = index_end + 1
+        self._groups = {}
+
+    def is_actual(self, sources):
+        return (
+            self.index['version'] == BUNDLE_VERSION
+            and self.index['sources'] == sources
+        )
+
+    def get_group(self, group_name):
+        """Return list of sprites from a folder of frames, e.g. `rocket`."""
+
+        if group_name not in self._groups:
+            offset, length = self.index['groups'][group_name]
+            start = self._payloads_start + offset
+            sprites_data = json.loads(self._data[start:start + length])
+            self._groups[group_name] = [
+                _load_sprite(sprite_data) for sprite_data in sprites_data
+            ]
+        return self._groups[group_name]
+
+    def close(self):
+        self._data.close()
+
+
+def load_frames(frames_dir=FRAMES_DIR, bundle_path=BUNDLE_PATH):
+    """Open the bundle of frames, rebuild it if source files have changed."""
+
+    sources = get_sources(frames_dir)
+    if os.path.exists(bundle_path):
+        bundle = FramesBundle(bundle_path)
+        if bundle.is_actual(sources):
+            return bundle
+        bundle.close()
+
+    build_bundle(sources, frames_dir, bundle_path)
+    return FramesBundle(bundle_path)
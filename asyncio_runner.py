@@ -0,0 +1,225 @@
+"""Run the game on a real asyncio event loop.
+
+Keys are read from stdin as soon as they arrive, game coroutines are
+asyncio tasks woken by tics of the loop timer.
+"""
+import asyncio
+import collections
+import sys
+import time
+
+
+class KeyQueue:
+    """Curses window wrapper, `getch` returns keys queued by `read_keys`.
+
+    Other sources of keys, e.g. network or replay, may `push` them too.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._key_codes = collections.deque()
+
+    def __getattr__(self, name):
+        return getattr(self.canvas, name)
+
+    def push(self, key_code):
+        self._key_codes.append(key_code)
+
+    def read_keys(self):
+        """Read all available keys, a callback of `loop.add_reader`."""
+
+        while True:
+            key_code = self.canvas.getch()
+            if key_code == -1:
+                break
+            self.push(key_code)
+
+    def getch(self):
+        if not self._key_codes:
+            return -1
+        return self._key_codes.popleft()
+
+
+class AsyncioScheduler:
+    """Scheduler with `scheduler.Scheduler` interface, every game coroutine
+    runs in an asyncio task.
+
+    A task waits for a future of its due tick, `run_tick` resolves futures
+    of the current tick in order coroutines were spawned.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self.resumes = 0
+        self._wheel = {}
+        self._coroutines_number = 0
+        self._spawned_number = 0
+        self._loop = None
+        self._on_error = None
+        self._pending_coroutines = []
+        self._tasks = set()
+        self.profiler = None
+
+    def __len__(self):
+        """Return number of live coroutines."""
+
+        return self._coroutines_number
+
+    def start(self, loop, on_error):
+        """Create tasks for coroutines spawned before the loop has started.
+
+        on_error — function called with an exception raised by a coroutine.
+        """
+
+        self._loop = loop
+        self._on_error = on_error
+        for coroutine in self._pending_coroutines:
+            self._create_task(coroutine)
+        self._pending_coroutines.clear()
+
+    def spawn(self, coroutine):
+        """Add coroutine, it will be resumed on the next tick."""
+
+        self._coroutines_number += 1
+        if self._loop is None:
+            self._pending_coroutines.append(coroutine)
+            return
+        self._create_task(coroutine)
+
+    def _create_task(self, coroutine):
+        spawn_number = self._spawned_number
+        self._spawned_number += 1
+        task = self._loop.create_task(
+            self._drive(spawn_number, coroutine, self.tick)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._on_error(task.exception())
+
+    def _wait(self, spawn_number, due_tick):
+        future = self._loop.create_future()
+        due_entries = self._wheel.get(due_tick)
+        if due_entries is None:
+            self._wheel[due_tick] = [(spawn_number, future)]
+        else:
+            due_entries.append((spawn_number, future))
+        return future
+
+    async def _drive(self, spawn_number, coroutine, due_tick):
+        try:
+            await self._wait(spawn_number, due_tick)
+            while True:
+                profiler = self.profiler
+                if profiler is not None:
+                    started_at = time.perf_counter()
+                try:
+                    tics = coroutine.send(None)
+                except StopIteration:
+                    return
+                finally:
+                    if profiler is not None:
+                        profiler.add_coroutine_time(
+                            coroutine, time.perf_counter() - started_at
+                        )
+                await self._wait(spawn_number, self.tick - 1 + (tics or 1))
+        finally:
+            coroutine.close()
+            self._coroutines_number -= 1
+
+    def run_tick(self):
+        """Wake tasks due to the current tick, they run as soon as
+        the caller returns control to the loop."""
+
+        due_entries = self._wheel.pop(self.tick, [])
+        due_entries.sort(key=_get_spawn_number)
+        self.tick += 1
+        self.resumes = len(due_entries)
+
+        for _, future in due_entries:
+            if not future.cancelled():
+                future.set_result(None)
+
+    def close(self):
+        """Cancel all tasks, close coroutines which have not started."""
+
+        for task in self._tasks:
+            task.cancel()
+        for coroutine in self._pending_coroutines:
+            coroutine.close()
+        self._pending_coroutines.clear()
+        self._wheel.clear()
+
+
+def _get_spawn_number(entry):
+    return entry[0]
+
+
+async def run_loop(
+    scheduler,
+    key_queue,
+    frame_clock,
+    run_tick,
+    render,
+    is_over,
+    services=()
+):
+    """Run tics on the loop timer until is_over returns True.
+
+    run_tick wakes coroutines of a tick, render is called when all woken
+    coroutines have made their step.
+    key_queue — queue of keys read from stdin, None if stdin is not read.
+    services — coroutines running along with the game, e.g. a server,
+    they are cancelled when the game is over.
+    """
+
+    loop = asyncio.get_running_loop()
+    finished = loop.create_future()
+
+    def stop(error=None):
+        if finished.done():
+            return
+        if error is None:
+            finished.set_result(None)
+        else:
+            finished.set_exception(error)
+
+    def start_tick():
+        frame_clock.start_tick()
+        if is_over():
+            stop()
+            return
+        run_tick()
+        # woken tasks are already in the loop queue, they will run first
+        loop.call_soon(finish_tick)
+
+    def finish_tick():
+        if finished.done():
+            return
+        render()
+        loop.call_later(frame_clock.plan_next_tick(), start_tick)
+
+    def on_service_done(task):
+        if not task.cancelled() and task.exception() is not None:
+            stop(task.exception())
+
+    scheduler.start(loop, stop)
+    if key_queue is not None:
+        stdin_fd = sys.stdin.fileno()
+        loop.add_reader(stdin_fd, key_queue.read_keys)
+    services_tasks = [loop.create_task(service) for service in services]
+    for task in services_tasks:
+        task.add_done_callback(on_service_done)
+    loop.call_soon(start_tick)
+    try:
+        await finished
+    finally:
+        if key_queue is not None:
+            loop.remove_reader(stdin_fd)
+        scheduler.close()
+        for task in services_tasks:
+            task.cancel()
+        await asyncio.gather(*services_tasks, return_exceptions=True)
@@ -0,0 +1,303 @@
+"""Autopilot, a replacement of `read_controls` which dodges garbage,
+e.g. to load-test late years of the game headless.
+
+Garbage flies down with a constant speed and never changes its column, so
+in a frame of reference falling with the garbage it stays still. The
+threat map keeps garbage in such frames, by columns of the spaceship
+corner: a piece is added when it appears and removed when it is gone,
+nothing is recomputed when tics pass. Where a piece is in any future tick
+is its origin plus speed multiplied by the tick.
+
+Every tick the autopilot plays a few tics ahead plans of directions held,
+with the physics of the spaceship, and takes the direction of the plan
+which keeps the spaceship away from garbage longer, closer to its home
+position.
+"""
+import game
+from assets import load_frames
+from curses_tools import get_frame_size
+from physics import ShipPhysics
+
+# directions (rows_direction, columns_direction) tried by the autopilot
+DIRECTIONS = [
+    (rows_direction, columns_direction)
+    for rows_direction in (-1, 0, 1)
+    for columns_direction in (-1, 0, 1)
+]
+# parts of the horizon after which a plan may change its direction
+SWITCH_PARTS = (0.2, 0.5)
+
+
+class ThreatMap:
+    """Garbage projected onto the next tics, updated incrementally.
+
+    A piece of garbage is kept in buckets of spaceship corner columns
+    which overlap it, as (low, high, speed, first column, last column):
+    rows of the spaceship corner strictly between low + speed * tick and
+    high + speed * tick collide with the piece in the tick.
+    """
+
+    def __init__(self, ship_rows, ship_columns, columns_number):
+        self.ship_rows = ship_rows
+        self.ship_columns = ship_columns
+        self.buckets = [[] for _ in range(columns_number)]
+        # key of an obstacle — its entry and range of its buckets
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self, columns_number):
+        self.buckets = [[] for _ in range(columns_number)]
+        self._entries.clear()
+
+    def update(self, obstacles, garbage_params, tick):
+        """Add obstacles which have appeared and remove gone ones.
+        Positions of obstacles are the ones checked in the tick."""
+
+        entries = self._entries
+        if entries.keys() != obstacles.keys():
+            for uid in entries.keys() - obstacles.keys():
+                self._remove(uid)
+            for uid in obstacles.keys() - entries.keys():
+                obstacle = obstacles[uid]
+                _, speed = garbage_params.get(uid, (None, 0))
+                self._add(
+                    uid,
+                    obstacle.row,
+                    obstacle.column,
+                    obstacle.rows_size,
+                    obstacle.columns_size,
+                    speed,
+                    tick,
+                )
+
+    def update_batch(self, batch_obstacles, tick):
+        """`update` for obstacles of a `BatchSimulation`. Slots are reused,
+        so a piece of garbage is known by its slot and origin."""
+
+        slots = batch_obstacles.alive.nonzero()[0]
+        origins = (
+            batch_obstacles.row[slots] - batch_obstacles.speed[slots] * tick
+        ).round(3)
+        pieces = dict(zip(zip(slots.tolist(), origins.tolist()), slots))
+
+        entries = self._entries
+        for key in entries.keys() - pieces.keys():
+            self._remove(key)
+        for key in pieces.keys() - entries.keys():
+            slot = pieces[key]
+            self._add(
+                key,
+                float(batch_obstacles.row[slot]),
+                int(batch_obstacles.column[slot]),
+                int(batch_obstacles.rows_size[slot]),
+                int(batch_obstacles.columns_size[slot]),
+                float(batch_obstacles.speed[slot]),
+                tick,
+            )
+
+    def _add(self, key, row, column, rows_size, columns_size, speed, tick):
+        origin = row - speed * tick
+        last_column = column + columns_size - 1
+        entry = (
+            origin - self.ship_rows,
+            origin + rows_size,
+            speed,
+            column,
+            last_column,
+        )
+        first_bucket = max(column - self.ship_columns + 1, 0)
+        last_bucket = min(last_column, len(self.buckets) - 1)
+        for bucket_number in range(first_bucket, last_bucket + 1):
+            self.buckets[bucket_number].append(entry)
+        self._entries[key] = entry, first_bucket, last_bucket
+
+    def _remove(self, key):
+        entry, first_bucket, last_bucket = self._entries.pop(key)
+        for bucket_number in range(first_bucket, last_bucket + 1):
+            self.buckets[bucket_number].remove(entry)
+
+    def is_threatened(self, first_row, last_row, first_column, last_column,
+                      tick):
+        """Check if the spaceship corner moving in the tick within rows
+        first_row..last_row and columns first_column..last_column may hit
+        garbage, movement of garbage during the tick is taken into account.
+        """
+
+        buckets = self.buckets
+        for column in range(first_column, last_column + 1):
+            for low, high, speed, _, _ in buckets[column]:
+                shift = speed * tick
+                if first_row < high + shift and last_row > low + shift - speed:
+                    return True
+        return False
+
+    def has_target(self, row, column, tick):
+        """Check if garbage is above row in the column, e.g. to fire."""
+
+        for low, _, speed, first_column, last_column in self.buckets[column]:
+            if first_column <= column <= last_column:
+                garbage_row = low + self.ship_rows + speed * tick
+                if garbage_row < row:
+                    return True
+        return False
+
+
+class Autopilot:
+    """Controls of a spaceship of `game.world` chosen by a look-ahead
+    over the threat map. Fires at garbage above when the gun is available.
+
+    A plan holds a direction, and may change it once after a part of the
+    horizon, e.g. to slip aside and then stop in a gap between garbage.
+
+    horizon — tics played ahead.
+    home — position (row, column) of the spaceship corner the autopilot
+    returns to when it is safe, the start position by default.
+    """
+
+    def __init__(self, ship_number=0, horizon=20, home=None):
+        self.ship_number = ship_number
+        self.horizon = horizon
+        self.home = home
+        # tics since the start of a plan when its direction may change
+        self.switch_tics = {
+            max(round(horizon * switch_part), 1)
+            for switch_part in SWITCH_PARTS
+        }
+        frames_bundle = load_frames()
+        self.rocket_rows, self.rocket_columns = get_frame_size(
+            frames_bundle.get_group('rocket')[0]
+        )
+        frames_bundle.close()
+        # the same physics as in `game.animate_spaceship`
+        self.ship_physics = ShipPhysics(
+            row_speed_limit=4, column_speed_limit=4
+        )
+        self.threat_map = None
+        self._viewport_size = None
+
+    def __call__(self, canvas):
+        world = game.world
+        spaceship = world.spaceships[self.ship_number]
+        tick = game.get_running_tick()
+        viewport = game.viewport
+
+        if self._viewport_size != viewport.get_size():
+            self._viewport_size = viewport.get_size()
+            if self.threat_map is None:
+                self.threat_map = ThreatMap(
+                    self.rocket_rows,
+                    self.rocket_columns,
+                    viewport.columns_number,
+                )
+            else:
+                # columns of garbage have been clamped to the viewport
+                self.threat_map.clear(viewport.columns_number)
+            if self.home is None:
+                self.home = spaceship.row, spaceship.column
+        if world.batch_simulation is None:
+            self.threat_map.update(
+                world.obstacles, world.garbage_params, tick
+            )
+        else:
+            self.threat_map.update_batch(
+                world.batch_simulation.obstacles, tick
+            )
+
+        rows_direction, columns_direction = self._choose_direction(
+            spaceship, tick
+        )
+        fire_column = spaceship.column + self.rocket_columns // 2
+        space_pressed = (
+            world.year_settings.gun_available
+            and self.threat_map.has_target(spaceship.row, fire_column, tick)
+        )
+        return rows_direction, columns_direction, space_pressed
+
+    def _choose_direction(self, spaceship, tick):
+        """Return the first direction of the plan safe for the most tics,
+        directions towards home first. Stop at the first plan safe for
+        the whole horizon."""
+
+        horizon = self.horizon
+        home_row, home_column = self.home
+        viewport = game.viewport
+        max_row = max(viewport.max_row - self.rocket_rows, 1)
+        max_column = max(viewport.max_column - self.rocket_columns, 1)
+        home_row = min(home_row, max_row)
+        home_column = min(home_column, max_column)
+
+        def get_home_distance(direction):
+            rows_direction, columns_direction = direction
+            return (
+                abs(spaceship.row + rows_direction * 2 - home_row)
+                + abs(spaceship.column + columns_direction * 2 - home_column)
+            )
+
+        start_state = (
+            0,
+            spaceship.row,
+            spaceship.column,
+            spaceship.row_speed,
+            spaceship.column_speed,
+        )
+        best_direction, best_tics = (0, 0), -1
+        for direction in sorted(DIRECTIONS, key=get_home_distance):
+            safe_tics, switch_states = self._play_ahead(
+                start_state, direction, tick, max_row, max_column
+            )
+            for switch_state in reversed(switch_states):
+                for next_direction in DIRECTIONS:
+                    if safe_tics == horizon:
+                        break
+                    if next_direction == direction:
+                        continue
+                    next_safe_tics, _ = self._play_ahead(
+                        switch_state,
+                        next_direction,
+                        tick,
+                        max_row,
+                        max_column,
+                    )
+                    safe_tics = max(safe_tics, next_safe_tics)
+
+            if safe_tics > best_tics:
+                best_direction, best_tics = direction, safe_tics
+            if best_tics == horizon:
+                break
+        return best_direction
+
+    def _play_ahead(self, state, direction, tick, max_row, max_column):
+        """Hold the direction from the state (step, row, column, row speed,
+        column speed) to the horizon. Return the number of tics the
+        spaceship is safe since the start of the plan and states reached
+        safely at tics of the direction change."""
+
+        rows_direction, columns_direction = direction
+        update_speed = self.ship_physics.update_speed
+        is_threatened = self.threat_map.is_threatened
+        switch_tics = self.switch_tics
+        first_step, row, column, row_speed, column_speed = state
+        switch_states = []
+
+        for step in range(first_step, self.horizon):
+            if step in switch_tics and step != first_step:
+                switch_states.append(
+                    (step, row, column, row_speed, column_speed)
+                )
+            row_speed, column_speed = update_speed(
+                row_speed, column_speed, rows_direction, columns_direction
+            )
+            next_row = min(max(round(row + row_speed), 1), max_row)
+            next_column = min(max(round(column + column_speed), 1), max_column)
+            if is_threatened(
+                min(row, next_row),
+                max(row, next_row),
+                min(column, next_column),
+                max(column, next_column),
+                tick + step,
+            ):
+                return step, switch_states
+            row, column = next_row, next_column
+        return self.horizon, switch_states
@@ -0,0 +1,377 @@
+"""Optional NumPy backend moving garbage and shots in batches.
+
+Every obstacle and projectile is a slot in structure-of-arrays. `step`
+advances all of them and tests collisions with array operations once per
+tick, coroutines only draw their slots. Collisions are swept: the way of
+a shot or the rocket since the previous tick is tested, so fast objects
+don't jump over garbage.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class _Slots:
+    """Structure-of-arrays with a free list of unused slots."""
+
+    def __init__(self, fields, capacity):
+        self._fields = fields
+        self.capacity = capacity
+        for name, dtype in fields.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.alive = np.zeros(capacity, dtype=bool)
+        self._free_slots = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self._free_slots)
+
+    def _grow(self):
+        capacity = self.capacity
+        for name in self._fields:
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate([array, np.zeros_like(array)]))
+        self.alive = np.concatenate([self.alive, np.zeros_like(self.alive)])
+        self._free_slots = list(range(capacity * 2 - 1, capacity - 1, -1))
+        self.capacity = capacity * 2
+
+    def add(self, **values):
+        if not self._free_slots:
+            self._grow()
+        slot = self._free_slots.pop()
+        for name, value in values.items():
+            getattr(self, name)[slot] = value
+        self.alive[slot] = True
+        return slot
+
+    def remove(self, slot):
+        self.alive[slot] = False
+        self._free_slots.append(slot)
+
+    def remove_many(self, slots):
+        self.alive[slots] = False
+        self._free_slots.extend(slots.tolist())
+
+
+class BatchSimulation:
+    """Garbage and projectiles simulated with NumPy arrays.
+
+    A garbage coroutine adds its obstacle, reads its position every tick
+    and removes the slot when the obstacle has left the screen or got
+    `obstacles.hit` flag. Projectiles are drawn all together by
+    `get_flying_projectiles`, a projectile which hit an obstacle or left
+    the screen is removed by `step`.
+    """
+
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise RuntimeError(
+                'NumPy is required for the batch simulation backend. '
+                'Install it with: pip install numpy'
+            )
+
+        self.obstacles = _Slots(
+            {
+                'row': np.float64,
+                'column': np.float64,
+                'rows_size': np.float64,
+                'columns_size': np.float64,
+                'speed': np.float64,
+                'hit': bool,
+            },
+            capacity,
+        )
+        self.projectiles = _Slots(
+            {
+                'row': np.float64,
+                'column': np.float64,
+                'rows_speed': np.float64,
+                'columns_speed': np.float64,
+                'flying': bool,
+            },
+            capacity,
+        )
+
+    def add_obstacle(self, row, column, rows_size, columns_size, speed=0.5):
+        return self.obstacles.add(
+            row=row,
+            column=column,
+            rows_size=rows_size,
+            columns_size=columns_size,
+            speed=speed,
+            hit=False,
+        )
+
+    def add_projectile(
+        self,
+        row,
+        column,
+        rows_speed=-0.3,
+        columns_speed=0
+    ):
+        """Add a projectile, it stays in place until `launch` is called."""
+
+        return self.projectiles.add(
+            row=row,
+            column=column,
+            rows_speed=rows_speed,
+            columns_speed=columns_speed,
+            flying=False,
+        )
+
+    def launch(self, slot):
+        self.projectiles.flying[slot] = True
+
+    def step(self, rows_number, columns_number):
+        """Move obstacles and flying projectiles, then test collisions."""
+
+        obstacles = self.obstacles
+        obstacles.row += np.where(obstacles.alive, obstacles.speed, 0)
+
+        projectiles = self.projectiles
+        flying = projectiles.alive & projectiles.flying
+        flying_slots = np.flatnonzero(flying)
+        previous_rows = np.round(projectiles.row[flying_slots])
+        previous_columns = np.round(projectiles.column[flying_slots])
+        projectiles.row += np.where(flying, projectiles.rows_speed, 0)
+        projectiles.column += np.where(flying, projectiles.columns_speed, 0)
+
+        self._test_collisions(flying_slots, previous_rows, previous_columns)
+
+        rows = projectiles.row[flying_slots]
+        columns = projectiles.column[flying_slots]
+        inside = (
+            (0 < rows) & (rows < rows_number - 1)
+            & (0 < columns) & (columns < columns_number - 1)
+        )
+        projectiles.alive[flying_slots[~inside]] = False
+
+        dead_slots = flying_slots[~projectiles.alive[flying_slots]]
+        projectiles.remove_many(dead_slots)
+
+    def get_flying_projectiles(self):
+        """Return rounded rows and columns of flying projectiles
+        and a mask of projectiles flying by columns."""
+
+        projectiles = self.projectiles
+        slots = np.flatnonzero(projectiles.alive & projectiles.flying)
+        rows = np.round(projectiles.row[slots]).astype(int)
+        columns = np.round(projectiles.column[slots]).astype(int)
+        horizontal = projectiles.columns_speed[slots] != 0
+        return rows, columns, horizontal
+
+    def _test_collisions(
+        self,
+        projectiles_slots,
+        previous_rows,
+        previous_columns,
+        chunk_size=4096
+    ):
+        """Mark obstacles hit by projectiles on their way from previous
+        rows and columns, arrays of the projectiles slots."""
+
+        obstacles = self.obstacles
+        obstacles_slots = np.flatnonzero(obstacles.alive)
+        if not len(obstacles_slots) or not len(projectiles_slots):
+            return
+
+        obstacles_rows = obstacles.row[obstacles_slots]
+        obstacles_columns = obstacles.column[obstacles_slots]
+        rows_sizes = obstacles.rows_size[obstacles_slots]
+        columns_sizes = obstacles.columns_size[obstacles_slots]
+        rows_shifts = obstacles.speed[obstacles_slots]
+
+        for chunk_start in range(0, len(projectiles_slots), chunk_size):
+            chunk_end = chunk_start + chunk_size
+            chunk = projectiles_slots[chunk_start:chunk_end]
+            rows = np.round(self.projectiles.row[chunk])[:, np.newaxis]
+            columns = np.round(self.projectiles.column[chunk])[:, np.newaxis]
+
+            collisions = get_collisions(
+                obstacles_rows,
+                obstacles_columns,
+                rows_sizes,
+                columns_sizes,
+                rows,
+                columns,
+                previous_objs_rows=previous_rows[
+                    chunk_start:chunk_end, np.newaxis
+                ],
+                previous_objs_columns=previous_columns[
+                    chunk_start:chunk_end, np.newaxis
+                ],
+                obstacles_rows_shifts=rows_shifts,
+            )
+            hit_projectiles = collisions.any(axis=1)
+            # like a coroutine, a projectile hits the first obstacle found
+            first_hit = collisions.argmax(axis=1)[hit_projectiles]
+            obstacles.hit[obstacles_slots[first_hit]] = True
+            self.projectiles.alive[chunk[hit_projectiles]] = False
+
+    def has_obstacle_collision(
+        self,
+        row,
+        column,
+        rows_size=1,
+        columns_size=1,
+        previous_row=None,
+        previous_column=None
+    ):
+        """Test a box, e.g. the rocket, against all alive obstacles moved
+        by `step`. The way of the box from the previous position is tested
+        if it is given."""
+
+        obstacles = self.obstacles
+        slots = np.flatnonzero(obstacles.alive)
+        collisions = get_collisions(
+            obstacles.row[slots],
+            obstacles.column[slots],
+            obstacles.rows_size[slots],
+            obstacles.columns_size[slots],
+            row,
+            column,
+            rows_size,
+            columns_size,
+            previous_row,
+            previous_column,
+            obstacles.speed[slots],
+        )
+        return bool(collisions.any())
+
+
+def _is_point_inside(
+        corner_rows,
+        corner_columns,
+        sizes_rows,
+        sizes_columns,
+        point_rows,
+        point_columns):
+    return (
+        (corner_rows <= point_rows)
+        & (point_rows < corner_rows + sizes_rows)
+        & (corner_columns <= point_columns)
+        & (point_columns < corner_columns + sizes_columns)
+    )
+
+
+def get_collisions(
+        obstacles_rows,
+        obstacles_columns,
+        obstacles_rows_sizes,
+        obstacles_columns_sizes,
+        objs_rows,
+        objs_columns,
+        objs_rows_sizes=1,
+        objs_columns_sizes=1,
+        previous_objs_rows=None,
+        previous_objs_columns=None,
+        obstacles_rows_shifts=0):
+    """Vectorized `obstacles.has_collision`, arguments are broadcast.
+
+    With previous positions of objects it is vectorized
+    `Obstacle.has_swept_collision` instead, obstacles_rows_shifts — rows
+    obstacles have moved by since the previous positions.
+    """
+
+    if previous_objs_rows is not None:
+        return _get_swept_collisions(
+            obstacles_rows,
+            obstacles_columns,
+            obstacles_rows_sizes,
+            obstacles_columns_sizes,
+            obstacles_rows_shifts,
+            previous_objs_rows,
+            previous_objs_columns,
+            objs_rows,
+            objs_columns,
+            objs_rows_sizes,
+            objs_columns_sizes,
+        )
+
+    return (
+        _is_point_inside(
+            obstacles_rows, obstacles_columns,
+            obstacles_rows_sizes, obstacles_columns_sizes,
+            objs_rows, objs_columns,
+        )
+        | _is_point_inside(
+            obstacles_rows, obstacles_columns,
+            obstacles_rows_sizes, obstacles_columns_sizes,
+            objs_rows + objs_rows_sizes - 1,
+            objs_columns + objs_columns_sizes - 1,
+        )
+        | _is_point_inside(
+            objs_rows, objs_columns, objs_rows_sizes, objs_columns_sizes,
+            obstacles_rows, obstacles_columns,
+        )
+        | _is_point_inside(
+            objs_rows, objs_columns, objs_rows_sizes, objs_columns_sizes,
+            obstacles_rows + obstacles_rows_sizes - 1,
+            obstacles_columns + obstacles_columns_sizes - 1,
+        )
+    )
+
+
+def _get_swept_collisions(
+        obstacles_rows,
+        obstacles_columns,
+        obstacles_rows_sizes,
+        obstacles_columns_sizes,
+        obstacles_rows_shifts,
+        start_rows,
+        start_columns,
+        end_rows,
+        end_columns,
+        objs_rows_sizes,
+        objs_columns_sizes):
+    # the slab test of `Obstacle.has_swept_collision`, in the frame of
+    # obstacles, boxes of obstacles are grown by the object size
+    start_rows = start_rows + obstacles_rows_shifts
+    low_rows = obstacles_rows - objs_rows_sizes
+    high_rows = obstacles_rows + obstacles_rows_sizes
+    low_columns = obstacles_columns - objs_columns_sizes
+    high_columns = obstacles_columns + obstacles_columns_sizes
+
+    columns_deltas = end_columns - start_columns
+    if not np.any(columns_deltas):
+        # Fast path of shots and the rocket moving by rows only: the way
+        # is inside the box for a while if rows of the way overlap rows of
+        # the box, no division is needed. A still object is inside or not.
+        first_rows = np.minimum(start_rows, end_rows)
+        last_rows = np.maximum(start_rows, end_rows)
+        inside_rows = (
+            np.maximum(low_rows, first_rows) < np.minimum(high_rows, last_rows)
+        )
+        still = first_rows == last_rows
+        if np.any(still):
+            inside_rows |= still & (low_rows < first_rows) & (
+                first_rows < high_rows
+            )
+        return (
+            inside_rows
+            & (low_columns < start_columns) & (start_columns < high_columns)
+        )
+
+    entering, leaving = 0, 1
+    inside = True
+    for start, delta, low, high in (
+        (start_rows, end_rows - start_rows, low_rows, high_rows),
+        (start_columns, columns_deltas, low_columns, high_columns),
+    ):
+        moving = delta != 0
+        # times of an axis the object doesn't move by are never used,
+        # avoid division by zero
+        divider = np.where(moving, delta, 1)
+        low_time = (low - start) / divider
+        high_time = (high - start) / divider
+        entering = np.where(
+            moving, np.maximum(entering, np.minimum(low_time, high_time)),
+            entering,
+        )
+        leaving = np.where(
+            moving, np.minimum(leaving, np.maximum(low_time, high_time)),
+            leaving,
+        )
+        inside = inside & (moving | ((low < start) & (start < high)))
+
+    return inside & (entering < leaving)
@@ -0,0 +1,130 @@
+"""Compare per-tick collision cost of the linear scan, the spatial grid
+and the spatial grid with swept collisions of bullets moving one row a tick.
+
+Usage:
+    python benchmark_collisions.py [obstacles_number] [bullets_number]
+"""
+import random
+import sys
+import time
+
+from obstacles import Obstacle
+from spatial_grid import SpatialGrid
+
+ROWS_NUMBER = 150
+COLUMNS_NUMBER = 500
+TICS = 50
+# the linear scan is far slower, a few tics are enough to measure it
+LINEAR_SCAN_TICS = 3
+
+
+def create_obstacles(obstacles_number):
+    obstacles = []
+    for _ in range(obstacles_number):
+        obstacle = Obstacle(
+            random.uniform(0, ROWS_NUMBER),
+            random.randint(0, COLUMNS_NUMBER),
+            random.randint(2, 9),
+            random.randint(4, 22),
+        )
+        obstacles.append(obstacle)
+    return obstacles
+
+
+def create_bullets(bullets_number):
+    return [
+        (random.randint(0, ROWS_NUMBER), random.randint(0, COLUMNS_NUMBER))
+        for _ in range(bullets_number)
+    ]
+
+
+def run_linear_scan(obstacles, bullets, tics=LINEAR_SCAN_TICS):
+    """Return the time of a tick and numbers of collisions by tics."""
+
+    collisions = [0] * tics
+    started_at = time.perf_counter()
+    for tick in range(tics):
+        for obstacle in obstacles:
+            obstacle.row += 0.5
+        for row, column in bullets:
+            for obstacle in obstacles:
+                if obstacle.has_collision(row, column):
+                    collisions[tick] += 1
+                    break
+    return (time.perf_counter() - started_at) / tics, collisions
+
+
+def run_spatial_grid(obstacles, bullets, tics=TICS):
+    collisions = [0] * tics
+    grid = SpatialGrid()
+    for obstacle in obstacles:
+        grid.add(obstacle)
+
+    started_at = time.perf_counter()
+    for tick in range(tics):
+        for obstacle in obstacles:
+            obstacle.move(obstacle.row + 0.5, obstacle.column)
+            grid.move(obstacle)
+        for row, column in bullets:
+            for obstacle in grid.query(row, column):
+                if obstacle.has_collision(row, column):
+                    collisions[tick] += 1
+                    break
+    return (time.perf_counter() - started_at) / tics, collisions
+
+
+def run_swept_spatial_grid(obstacles, bullets, tics=TICS):
+    collisions = [0] * tics
+    grid = SpatialGrid()
+    for obstacle in obstacles:
+        grid.add(obstacle)
+
+    started_at = time.perf_counter()
+    for tick in range(tics):
+        for obstacle in obstacles:
+            obstacle.move(obstacle.row + 0.5, obstacle.column)
+            grid.move(obstacle)
+        for row, column in bullets:
+            candidates = grid.query_segment(row + 1, column, row, column)
+            for obstacle in candidates:
+                if obstacle.has_swept_collision(row + 1, column, row, column):
+                    collisions[tick] += 1
+                    break
+    return (time.perf_counter() - started_at) / tics, collisions
+
+
+def reset_obstacles(obstacles, start_rows):
+    for obstacle, row in zip(obstacles, start_rows):
+        obstacle.row = obstacle.previous_row = row
+
+
+def main():
+    obstacles_number = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    bullets_number = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    random.seed(0)
+    obstacles = create_obstacles(obstacles_number)
+    bullets = create_bullets(bullets_number)
+    start_rows = [obstacle.row for obstacle in obstacles]
+
+    linear_tick, linear_collisions = run_linear_scan(obstacles, bullets)
+
+    reset_obstacles(obstacles, start_rows)
+    grid_tick, grid_collisions = run_spatial_grid(obstacles, bullets)
+
+    reset_obstacles(obstacles, start_rows)
+    swept_tick, swept_collisions = run_swept_spatial_grid(obstacles, bullets)
+
+    # collisions of the first tics, the linear scan and the grid agree
+    print(f'{obstacles_number} obstacles, {bullets_number} bullets, '
+          f'collisions in {LINEAR_SCAN_TICS} tics')
+    print(f'linear scan:  {linear_tick * 1000:.2f} ms per tick, '
+          f'{sum(linear_collisions)} collisions')
+    print(f'spatial grid: {grid_tick * 1000:.2f} ms per tick, '
+          f'{sum(grid_collisions[:LINEAR_SCAN_TICS])} collisions')
+    print(f'swept grid:   {swept_tick * 1000:.2f} ms per tick, '
+          f'{sum(swept_collisions[:LINEAR_SCAN_TICS])} collisions')
+
+
+if __name__ == '__main__':
+    main()
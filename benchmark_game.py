@@ -0,0 +1,167 @@
+"""Measure per-tick cost of the game for terminal sizes and game years.
+
+Usage:
+    python benchmark_game.py --output results.json
+    python benchmark_game.py --compare results.json
+
+Every case runs the game headless from the start year for a fixed number
+of tics. The first tics are a warm-up: garbage has to fill the orbit.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+import game
+from headless import FakeCanvas, run_headless
+
+SIZES = [(24, 80), (60, 200), (150, 500)]
+YEARS = [1960, 1995, 2025]
+
+
+def measure_tics(rows_number, columns_number, year, tics, warmup_tics, seed):
+    canvas = FakeCanvas(rows_number, columns_number)
+    tics_durations = []
+    tics_calls = []
+    coroutines_numbers = []
+    resumes_numbers = []
+    last_tick = {'time': time.perf_counter(), 'calls': 0}
+
+    def on_tick():
+        now = time.perf_counter()
+        if game.scheduler.tick > warmup_tics:
+            tics_durations.append(now - last_tick['time'])
+            tics_calls.append(canvas.calls - last_tick['calls'])
+            coroutines_numbers.append(len(game.scheduler))
+            resumes_numbers.append(game.scheduler.resumes)
+        last_tick['calls'] = canvas.calls
+        last_tick['time'] = time.perf_counter()
+
+    game.draw(
+        canvas,
+        seed=seed,
+        tick_rate=None,
+        start_year=year,
+        tics_limit=warmup_tics + tics,
+        on_tick=on_tick,
+    )
+    return tics_durations, tics_calls, coroutines_numbers, resumes_numbers
+
+
+def measure_peak_memory(rows_number, columns_number, year, tics, seed):
+    tracemalloc.start()
+    run_headless(
+        rows_number,
+        columns_number,
+        seed=seed,
+        start_year=year,
+        end_year=None,
+        tics_limit=tics,
+    )
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_memory
+
+
+def run_case(rows_number, columns_number, year, tics, warmup_tics, seed):
+    durations, calls, coroutines_numbers, resumes_numbers = measure_tics(
+        rows_number, columns_number, year, tics, warmup_tics, seed
+    )
+    peak_memory = measure_peak_memory(
+        rows_number, columns_number, year, warmup_tics + tics, seed
+    )
+    return {
+        'size': f'{columns_number}x{rows_number}',
+        'year': year,
+        'tics': len(durations),
+        'mean_tick_ms': statistics.mean(durations) * 1000,
+        'p99_tick_ms': statistics.quantiles(durations, n=100)[98] * 1000,
+        'calls_per_tick': statistics.mean(calls),
+        'mean_coroutines': statistics.mean(coroutines_numbers),
+        'max_coroutines': max(coroutines_numbers),
+        'resumes_per_tick': statistics.mean(resumes_numbers),
+        'peak_memory_kb': peak_memory / 1024,
+    }
+
+
+def print_results(results, baseline_results=None):
+    baseline = {
+        (result['size'], result['year']): result
+        for result in baseline_results or []
+    }
+    columns = [
+        'mean_tick_ms',
+        'p99_tick_ms',
+        'calls_per_tick',
+        'mean_coroutines',
+        'resumes_per_tick',
+        'peak_memory_kb',
+    ]
+    print(f'{"size":>8} {"year":>5} ' + ' '.join(
+        f'{column:>16}' for column in columns
+    ))
+    for result in results:
+        cells = []
+        baseline_result = baseline.get((result['size'], result['year']))
+        for column in columns:
+            cell = f'{result[column]:.2f}'
+            if baseline_result and baseline_result[column]:
+                change = result[column] / baseline_result[column] - 1
+                cell += f' ({change:+.0%})'
+            cells.append(f'{cell:>16}')
+        print(f'{result["size"]:>8} {result["year"]:>5} ' + ' '.join(cells))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark per-tick cost of the space game'
+    )
+    parser.add_argument('--tics', type=int, default=300)
+    parser.add_argument('--warmup-tics', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--output',
+        help='write results to a JSON file',
+    )
+    parser.add_argument(
+        '--compare',
+        help='JSON file with results of another commit to compare with',
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    results = []
+    for rows_number, columns_number in SIZES:
+        for year in YEARS:
+            print(
+                f'{columns_number}x{rows_number}, {year}...',
+                file=sys.stderr,
+            )
+            results.append(run_case(
+                rows_number,
+                columns_number,
+                year,
+                args.tics,
+                args.warmup_tics,
+                args.seed,
+            ))
+
+    baseline_results = None
+    if args.compare:
+        with open(args.compare, 'r') as baseline_file:
+            baseline_results = json.load(baseline_file)
+
+    print_results(results, baseline_results)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
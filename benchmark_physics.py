@@ -0,0 +1,127 @@
+"""Check `ShipPhysics` against `update_speed` and compare their cost.
+
+Usage:
+    python benchmark_physics.py [ships_number]
+
+Random ships are advanced for a number of tics by `update_speed`,
+`ShipPhysics.update_speed` and `ShipPhysics.update_speeds`. Every tic
+starts from speeds of `update_speed`, so a rounding difference does not
+grow over tics. The script fails if speeds differ more than the tolerance.
+"""
+import random
+import sys
+import time
+
+from physics import ShipPhysics, update_speed
+
+TICS = 50
+SPEED_LIMIT = 4
+TOLERANCE = 1e-3
+STOP_SPEED = 0.1
+
+
+def create_tics(ships_number):
+    """Return list of tics, every tic is a list of ships
+    (row_speed, column_speed, rows_direction, columns_direction)."""
+
+    ships = [
+        (
+            random.uniform(-SPEED_LIMIT, SPEED_LIMIT),
+            random.uniform(-SPEED_LIMIT, SPEED_LIMIT),
+        )
+        for _ in range(ships_number)
+    ]
+    tics = []
+    for _ in range(TICS):
+        tic = [
+            (row_speed, column_speed, random.randint(-1, 1),
+             random.randint(-1, 1))
+            for row_speed, column_speed in ships
+        ]
+        tics.append(tic)
+        ships = [
+            update_speed(*ship, SPEED_LIMIT, SPEED_LIMIT) for ship in tic
+        ]
+    return tics
+
+
+def run_function(tics):
+    started_at = time.perf_counter()
+    results = [
+        [update_speed(*ship, SPEED_LIMIT, SPEED_LIMIT) for ship in tic]
+        for tic in tics
+    ]
+    return (time.perf_counter() - started_at) / TICS, results
+
+
+def run_ship_physics(tics):
+    ship_physics = ShipPhysics(SPEED_LIMIT, SPEED_LIMIT)
+    started_at = time.perf_counter()
+    results = [
+        [ship_physics.update_speed(*ship) for ship in tic]
+        for tic in tics
+    ]
+    return (time.perf_counter() - started_at) / TICS, results
+
+
+def run_batch(tics):
+    ship_physics = ShipPhysics(SPEED_LIMIT, SPEED_LIMIT)
+    tics_columns = [[list(column) for column in zip(*tic)] for tic in tics]
+
+    started_at = time.perf_counter()
+    results = [
+        ship_physics.update_speeds(*tic_columns)
+        for tic_columns in tics_columns
+    ]
+    duration = (time.perf_counter() - started_at) / TICS
+    return duration, [list(zip(*result)) for result in results]
+
+
+def get_error(speed, expected_speed):
+    """Return difference of speeds. A ship stops when its speed is below
+    0.1, so a speed close to 0.1 may be stopped by one function only."""
+
+    error = abs(speed - expected_speed)
+    if not speed or not expected_speed:
+        return max(error - STOP_SPEED, 0)
+    return error
+
+
+def get_max_error(results, expected_results):
+    return max(
+        max(get_error(row_speed, expected_row_speed),
+            get_error(column_speed, expected_column_speed))
+        for ships, expected_ships in zip(results, expected_results)
+        for (row_speed, column_speed), (expected_row_speed,
+                                        expected_column_speed)
+        in zip(ships, expected_ships)
+    )
+
+
+def main():
+    ships_number = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    random.seed(0)
+    tics = create_tics(ships_number)
+
+    function_tick, expected_results = run_function(tics)
+    print(f'{ships_number} ships')
+    print(f'{"update_speed:":<27}{function_tick * 1000:.2f} ms per tick')
+
+    failed = False
+    for name, run in (
+        ('ShipPhysics.update_speed', run_ship_physics),
+        ('ShipPhysics.update_speeds', run_batch),
+    ):
+        tick, results = run(tics)
+        max_error = get_max_error(results, expected_results)
+        print(f'{name + ":":<27}{tick * 1000:.2f} ms per tick, '
+              f'max error {max_error:.2e}')
+        failed = failed or max_error > TOLERANCE
+
+    if failed:
+        sys.exit(f'Speeds differ more than {TOLERANCE}')
+
+
+if __name__ == '__main__':
+    main()
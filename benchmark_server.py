@@ -0,0 +1,113 @@
+"""Check the game server against loopback clients and report traffic.
+
+Usage:
+    python benchmark_server.py [spectators] [slow_spectators]
+
+The game runs with a server on a free local port. Spectators read every
+frame, slow ones sleep between frames and have small socket buffers, so
+the server drops their frames and sends keyframes. A pilot fires every
+tick. Screens of all clients are compared with the screen of the server
+at every tick they have received, the script fails on a difference.
+"""
+import asyncio
+import sys
+import time
+import zlib
+
+from game_client import ScreenClient
+from game_server import SPACE_FLAG, GameServer, format_stats, run_server
+
+ROWS_NUMBER = 60
+COLUMNS_NUMBER = 200
+TICS = 300
+TICK_RATE = 50
+SLOW_CLIENT_DELAY = 0.04
+SLOW_CLIENT_BUFFER_SIZE = 4096
+
+
+async def run_client(server, checksums, pilot=False, slow=False):
+    """Read frames until cancelled, record checksums of the screen
+    by tics."""
+
+    host, port = server.address
+    client = await ScreenClient.connect(
+        host,
+        port,
+        pilot,
+        SLOW_CLIENT_BUFFER_SIZE if slow else None,
+    )
+    try:
+        while True:
+            await client.read_frame()
+            checksums[client.tick] = zlib.crc32(client.get_text().encode())
+            client.send_input(SPACE_FLAG if pilot else 0)
+            if slow:
+                await asyncio.sleep(SLOW_CLIENT_DELAY)
+    finally:
+        client.close()
+
+
+async def run_clients(server, clients_checksums, spectators, slow_spectators):
+    # wait until the server listens
+    while server.address is None:
+        await asyncio.sleep(0.01)
+
+    clients = [run_client(server, clients_checksums[0], pilot=True)]
+    for client_number in range(1, len(clients_checksums)):
+        clients.append(run_client(
+            server,
+            clients_checksums[client_number],
+            slow=client_number > spectators,
+        ))
+    await asyncio.gather(*clients)
+
+
+def main():
+    spectators = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    slow_spectators = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    server = GameServer(
+        ROWS_NUMBER,
+        COLUMNS_NUMBER,
+        ships_number=1,
+        max_buffer_size=8 * 1024,
+        send_buffer_size=SLOW_CLIENT_BUFFER_SIZE,
+    )
+    server_checksums = {}
+    clients_checksums = [{} for _ in range(1 + spectators + slow_spectators)]
+
+    def record_checksum():
+        server_checksums[server.tick] = zlib.crc32(
+            server.get_text().encode()
+        )
+
+    started_at = time.perf_counter()
+    run_server(
+        server,
+        port=0,
+        seed=1,
+        tick_rate=TICK_RATE,
+        start_year=2020,
+        tics_limit=TICS,
+        on_tick=record_checksum,
+        services=[run_clients(
+            server, clients_checksums, spectators, slow_spectators
+        )],
+    )
+    duration = time.perf_counter() - started_at
+
+    print(f'{TICS} tics in {duration:.2f} s')
+    print(format_stats(server.get_stats()))
+
+    differences = 0
+    for client_number, checksums in enumerate(clients_checksums):
+        for tick, checksum in checksums.items():
+            if server_checksums.get(tick) != checksum:
+                differences += 1
+        print(f'client {client_number}: {len(checksums)} tics compared')
+    if differences:
+        sys.exit(f'Screens of clients differ at {differences} tics')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Measure how the cost of a tick scales with the amount of garbage.
+
+Usage:
+    python benchmark_stress.py
+    python benchmark_stress.py --size 80x24 --scenario scenarios/stress.json
+
+The game runs headless with the autopilot through a scenario launching
+more and more garbage, `scenarios/stress.json` by default. Tics are
+grouped by garbage launched per tick: the report shows garbage on the
+screen, the cost of a tick, the time the autopilot takes of it and the
+share of tics the spaceship spends in garbage. The spaceship flies on
+after it crashes, so every group is measured with the autopilot, the
+year of the first crash is printed.
+"""
+import argparse
+import os
+import statistics
+import time
+
+import game
+from autopilot import Autopilot
+from game_scenario import SCENARIOS_DIR, load_scenario
+from headless import parse_size, run_headless
+
+STRESS_SCENARIO_PATH = os.path.join(SCENARIOS_DIR, 'stress.json')
+
+
+class TimedAutopilot(Autopilot):
+    """Autopilot which sums time spent on its decisions."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.duration = 0
+
+    def __call__(self, canvas):
+        started_at = time.perf_counter()
+        controls = super().__call__(canvas)
+        self.duration += time.perf_counter() - started_at
+        return controls
+
+
+def measure_stress(rows_number, columns_number, seed, end_year, scenario_path):
+    """Play the scenario, return tics measures grouped by garbage per tick
+    and the year of the crash or None."""
+
+    autopilot = TimedAutopilot()
+    groups = {}
+    last_tick = {'time': time.perf_counter(), 'autopilot': 0}
+    crash = {'year': None}
+
+    def on_tick():
+        now = time.perf_counter()
+        world = game.world
+        settings = world.year_settings
+        garbage_per_tick = 0
+        if settings.garbage_delay_tics:
+            garbage_per_tick = (
+                settings.garbage_per_launch / settings.garbage_delay_tics
+            )
+        group = groups.setdefault(
+            garbage_per_tick,
+            {
+                'years': set(),
+                'durations': [],
+                'autopilot': [],
+                'garbage': [],
+                'in_garbage': [],
+            },
+        )
+        group['years'].add(world.year)
+        group['durations'].append(now - last_tick['time'])
+        group['autopilot'].append(autopilot.duration - last_tick['autopilot'])
+        group['garbage'].append(len(world.obstacles))
+        group['in_garbage'].append(is_in_garbage(
+            world, autopilot.rocket_rows, autopilot.rocket_columns
+        ))
+        if crash['year'] is None and world.game_stats['game_over_tick'] >= 0:
+            crash['year'] = world.year
+        last_tick['autopilot'] = autopilot.duration
+        last_tick['time'] = time.perf_counter()
+
+    run_headless(
+        rows_number,
+        columns_number,
+        seed=seed,
+        start_year=load_scenario(scenario_path).first_year,
+        end_year=end_year,
+        on_tick=on_tick,
+        controls_reader=autopilot,
+        scenario_path=scenario_path,
+        keep_flying=True,
+    )
+    return groups, crash['year']
+
+
+def is_in_garbage(world, rocket_rows, rocket_columns):
+    spaceship = world.spaceships[0]
+    box = spaceship.row, spaceship.column, rocket_rows, rocket_columns
+    return any(
+        obstacle.has_collision(*box)
+        for obstacle in world.obstacles_grid.query(*box)
+    )
+
+
+def print_groups(groups):
+    print(
+        f'{"years":>11} {"garbage/tick":>12} {"on screen":>10} '
+        f'{"tick ms":>8} {"max ms":>8} {"autopilot ms":>13} '
+        f'{"in garbage":>10}'
+    )
+    for garbage_per_tick, group in sorted(groups.items()):
+        years = f'{min(group["years"])}-{max(group["years"])}'
+        print(
+            f'{years:>11} {garbage_per_tick:>12.2f} '
+            f'{statistics.mean(group["garbage"]):>10.1f} '
+            f'{statistics.mean(group["durations"]) * 1000:>8.3f} '
+            f'{max(group["durations"]) * 1000:>8.3f} '
+            f'{statistics.mean(group["autopilot"]) * 1000:>13.3f} '
+            f'{statistics.mean(group["in_garbage"]):>10.1%}'
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Measure the cost of a tick by garbage per tick'
+    )
+    parser.add_argument(
+        '--size',
+        type=parse_size,
+        default=(60, 200),
+        help='canvas size COLUMNSxROWS, 200x60 by default',
+    )
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--end-year', type=int, default=1985)
+    parser.add_argument(
+        '--scenario',
+        default=STRESS_SCENARIO_PATH,
+        metavar='FILE',
+        help='JSON file of the scenario, scenarios/stress.json by default',
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rows_number, columns_number = args.size
+
+    started_at = time.perf_counter()
+    groups, crash_year = measure_stress(
+        rows_number,
+        columns_number,
+        args.seed,
+        args.end_year,
+        args.scenario,
+    )
+    duration = time.perf_counter() - started_at
+
+    print_groups(groups)
+    print(f'{game.scheduler.tick} tics in {duration:.2f} s')
+    if crash_year is None:
+        print('The spaceship has survived')
+    else:
+        print(f'The spaceship has crashed in {crash_year}')
+
+
+if __name__ == '__main__':
+    main()
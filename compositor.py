@@ -0,0 +1,366 @@
+from terminal_output import CursesOutput
+
+BLANK_SYMBOL = ' '
+
+
+class Compositor:
+    """Back buffer for a curses window made of layers.
+
+    Coroutines draw on layers as on usual curses windows, cells are only
+    changed in memory. A space is transparent: a cell of the screen shows
+    the topmost layer which has a symbol in it, so erasing a frame on one
+    layer reveals what lower layers have beneath, e.g. stars under garbage.
+    A layer updates cells of the screen as it draws, cells covered by upper
+    layers stay as they are.
+
+    `flush` compares cells changed since the previous flush with the cells
+    sent to the terminal and writes changed cells with one `output.write`
+    per contiguous run of the same attributes.
+
+    layers_names — names of layers from the bottom to the top, drawing
+    methods of the compositor itself draw on the bottom layer.
+    output — backend from `terminal_output`, curses window by default.
+    """
+
+    def __init__(self, canvas, output=None, layers_names=('main',)):
+        self.canvas = canvas
+        self.output = output or CursesOutput(canvas)
+        self._rows_number, self._columns_number = canvas.getmaxyx()
+        self._symbols = self._create_rows(BLANK_SYMBOL)
+        self._attrs = self._create_rows(0)
+        self._screen_symbols = self._create_rows(BLANK_SYMBOL)
+        self._screen_attrs = self._create_rows(0)
+        # row — [first column, last column + 1] of changed cells
+        self._dirty_spans = {}
+
+        self.layers = {}
+        for name in layers_names:
+            self.layers[name] = Layer(self, list(self.layers.values()))
+        layers = list(self.layers.values())
+        for index, layer in enumerate(layers):
+            layer.upper_layers = layers[index + 1:]
+        self._bottom_layer = layers[0]
+
+    def _create_rows(self, value):
+        return [
+            [value] * self._columns_number
+            for _ in range(self._rows_number)
+        ]
+
+    def resize(self, rows_number, columns_number):
+        """Crop or extend the screen and layers keeping their cells,
+        e.g. when the terminal is resized. The next flush writes every
+        cell, since the terminal may have been redrawn."""
+
+        self._rows_number, self._columns_number = rows_number, columns_number
+        for rows, value in (
+            (self._symbols, BLANK_SYMBOL),
+            (self._attrs, 0),
+            *((layer.symbols, BLANK_SYMBOL) for layer in self.layers.values()),
+            *((layer.attrs, 0) for layer in self.layers.values()),
+        ):
+            _resize_rows(rows, value, rows_number, columns_number)
+        for layer in self.layers.values():
+            layer._rows_number = rows_number
+            layer._columns_number = columns_number
+
+        self._forget_screen()
+        self.output.resize(rows_number, columns_number)
+
+    def dump_layers(self):
+        """Return dict: layer name — rows of symbols as strings
+        and rows of attributes as lists, e.g. for a snapshot."""
+
+        return {
+            name: (
+                [''.join(symbols) for symbols in layer.symbols],
+                [list(attrs) for attrs in layer.attrs],
+            )
+            for name, layer in self.layers.items()
+        }
+
+    def load_layers(self, layers_cells):
+        """Replace cells of layers with `dump_layers` ones, the next flush
+        writes every cell."""
+
+        for name, (symbols_rows, attrs_rows) in layers_cells.items():
+            layer = self.layers[name]
+            layer.symbols[:] = [list(symbols) for symbols in symbols_rows]
+            layer.attrs[:] = [list(attrs) for attrs in attrs_rows]
+
+        top_layers = list(self.layers.values())[::-1]
+        for row in range(self._rows_number):
+            for column in range(self._columns_number):
+                for layer in top_layers:
+                    symbol = layer.symbols[row][column]
+                    if symbol != BLANK_SYMBOL:
+                        self._symbols[row][column] = symbol
+                        self._attrs[row][column] = layer.attrs[row][column]
+                        break
+                else:
+                    self._symbols[row][column] = BLANK_SYMBOL
+                    self._attrs[row][column] = 0
+        self._forget_screen()
+
+    def _forget_screen(self):
+        """Mark all cells as unknown on the terminal,
+        the next flush writes every cell."""
+
+        self._screen_symbols = self._create_rows(None)
+        self._screen_attrs = self._create_rows(0)
+        self._dirty_spans = {
+            row: [0, self._columns_number] for row in range(self._rows_number)
+        }
+
+    def _mark_dirty(self, row, start_column, end_column):
+        span = self._dirty_spans.get(row)
+        if span is None:
+            self._dirty_spans[row] = [start_column, end_column]
+            return
+        if start_column < span[0]:
+            span[0] = start_column
+        if end_column > span[1]:
+            span[1] = end_column
+
+    def get_layer(self, name):
+        return self.layers[name]
+
+    def getmaxyx(self):
+        return self._rows_number, self._columns_number
+
+    def getch(self):
+        return self.canvas.getch()
+
+    def nodelay(self, flag):
+        self.canvas.nodelay(flag)
+
+    def refresh(self):
+        """Do nothing, the buffer is sent to the terminal by `flush`."""
+
+    def derwin(self, *args):
+        return SubWindow(self, *args)
+
+    def addch(self, row, column, symbol, attr=0):
+        self._bottom_layer.addstr(row, column, symbol, attr)
+
+    def addstr(self, row, column, text, attr=0):
+        self._bottom_layer.addstr(row, column, text, attr)
+
+    def addpoints(self, rows, columns, symbol, attr=0):
+        self._bottom_layer.addpoints(rows, columns, symbol, attr)
+
+    def get_text(self):
+        """Return symbols of the screen, a line per row."""
+
+        return '\n'.join(''.join(symbols) for symbols in self._symbols)
+
+    def flush(self):
+        """Write cells changed since the previous flush to the output
+        and show them on the terminal."""
+
+        write = self.output.write
+        for row in sorted(self._dirty_spans):
+            start_column, end_column = self._dirty_spans[row]
+            for column, text, attr in self._get_changed_runs(
+                row, start_column, end_column
+            ):
+                write(row, column, text, attr)
+        self._dirty_spans.clear()
+        self.output.present()
+
+    def _get_changed_runs(self, row, start_column, end_column):
+        symbols = self._symbols[row]
+        attrs = self._attrs[row]
+        screen_symbols = self._screen_symbols[row]
+        screen_attrs = self._screen_attrs[row]
+
+        run_start = None
+        run_attr = 0
+        for column in range(start_column, end_column):
+            symbol = symbols[column]
+            attr = attrs[column]
+            changed = (
+                symbol != screen_symbols[column]
+                or attr != screen_attrs[column]
+            )
+            if run_start is not None and (not changed or attr != run_attr):
+                yield run_start, ''.join(symbols[run_start:column]), run_attr
+                run_start = None
+            if changed:
+                screen_symbols[column] = symbol
+                screen_attrs[column] = attr
+                if run_start is None:
+                    run_start = column
+                    run_attr = attr
+
+        if run_start is not None:
+            yield run_start, ''.join(symbols[run_start:end_column]), run_attr
+
+
+def _resize_rows(rows, value, rows_number, columns_number):
+    """Crop or extend a list of rows in place, new cells get value."""
+
+    del rows[rows_number:]
+    for row in rows:
+        if len(row) > columns_number:
+            del row[columns_number:]
+        else:
+            row.extend([value] * (columns_number - len(row)))
+    rows.extend(
+        [value] * columns_number for _ in range(rows_number - len(rows))
+    )
+
+
+class Layer:
+    """Layer of the compositor, drawn as a usual curses window.
+
+    lower_layers — layers of the compositor beneath this one.
+    """
+
+    def __init__(self, compositor, lower_layers):
+        self.compositor = compositor
+        self._rows_number, self._columns_number = compositor.getmaxyx()
+        self.symbols = compositor._create_rows(BLANK_SYMBOL)
+        self.attrs = compositor._create_rows(0)
+        self.lower_layers = lower_layers[::-1]
+        self.upper_layers = []
+
+    def getmaxyx(self):
+        return self._rows_number, self._columns_number
+
+    def getch(self):
+        return self.compositor.getch()
+
+    def nodelay(self, flag):
+        self.compositor.nodelay(flag)
+
+    def refresh(self):
+        """Do nothing, the buffer is sent to the terminal by `flush`."""
+
+    def derwin(self, *args):
+        return SubWindow(self, *args)
+
+    def addch(self, row, column, symbol, attr=0):
+        self.addstr(row, column, symbol, attr)
+
+    def addstr(self, row, column, text, attr=0):
+        if not 0 <= row < self._rows_number:
+            return
+
+        start_column = max(column, 0)
+        end_column = min(column + len(text), self._columns_number)
+        if start_column >= end_column:
+            return
+
+        symbols = self.symbols[row]
+        attrs = self.attrs[row]
+        upper_rows = [layer.symbols[row] for layer in self.upper_layers]
+        screen_symbols = self.compositor._symbols[row]
+        screen_attrs = self.compositor._attrs[row]
+        for current_column in range(start_column, end_column):
+            symbol = text[current_column - column]
+            symbols[current_column] = symbol
+            attrs[current_column] = attr
+
+            for upper_symbols in upper_rows:
+                if upper_symbols[current_column] != BLANK_SYMBOL:
+                    break
+            else:
+                if symbol == BLANK_SYMBOL:
+                    self._show_lower_cell(row, current_column)
+                else:
+                    screen_symbols[current_column] = symbol
+                    screen_attrs[current_column] = attr
+        self.compositor._mark_dirty(row, start_column, end_column)
+
+    def _show_lower_cell(self, row, column):
+        symbol = BLANK_SYMBOL
+        attr = 0
+        for layer in self.lower_layers:
+            if layer.symbols[row][column] != BLANK_SYMBOL:
+                symbol = layer.symbols[row][column]
+                attr = layer.attrs[row][column]
+                break
+        self.compositor._symbols[row][column] = symbol
+        self.compositor._attrs[row][column] = attr
+
+    def addpoints(self, rows, columns, symbol, attr=0):
+        """Write one symbol to many cells, e.g. to draw flying shots.
+        Cells out of the window are skipped."""
+
+        rows_number, columns_number = self._rows_number, self._columns_number
+        all_symbols = self.symbols
+        all_attrs = self.attrs
+        upper_layers_symbols = [layer.symbols for layer in self.upper_layers]
+        lower_layers_cells = [
+            (layer.symbols, layer.attrs) for layer in self.lower_layers
+        ]
+        screen_symbols = self.compositor._symbols
+        screen_attrs = self.compositor._attrs
+        dirty_rows = bytearray(rows_number)
+        for row, column in zip(rows, columns):
+            if not (0 <= row < rows_number and 0 <= column < columns_number):
+                continue
+
+            all_symbols[row][column] = symbol
+            all_attrs[row][column] = attr
+            dirty_rows[row] = 1
+            for upper_symbols in upper_layers_symbols:
+                if upper_symbols[row][column] != BLANK_SYMBOL:
+                    break
+            else:
+                shown_symbol = symbol
+                shown_attr = attr
+                if symbol == BLANK_SYMBOL:
+                    for lower_symbols, lower_attrs in lower_layers_cells:
+                        shown_symbol = lower_symbols[row][column]
+                        if shown_symbol != BLANK_SYMBOL:
+                            shown_attr = lower_attrs[row][column]
+                            break
+                    else:
+                        shown_attr = 0
+                screen_symbols[row][column] = shown_symbol
+                screen_attrs[row][column] = shown_attr
+
+        for row, dirty in enumerate(dirty_rows):
+            if dirty:
+                self.compositor._mark_dirty(row, 0, columns_number)
+
+
+class SubWindow:
+    """Part of a compositor layer, a replacement of `window.derwin`."""
+
+    def __init__(self, compositor, *args):
+        if len(args) == 2:
+            begin_row, begin_column = args
+            parent_rows, parent_columns = compositor.getmaxyx()
+            rows_number = parent_rows - begin_row
+            columns_number = parent_columns - begin_column
+        else:
+            rows_number, columns_number, begin_row, begin_column = args
+
+        self.compositor = compositor
+        self.begin_row = begin_row
+        self.begin_column = begin_column
+        self._rows_number = rows_number
+        self._columns_number = columns_number
+
+    def getmaxyx(self):
+        return self._rows_number, self._columns_number
+
+    def refresh(self):
+        """Do nothing, the buffer is sent to the terminal by `flush`."""
+
+    def addch(self, row, column, symbol, attr=0):
+        self.addstr(row, column, symbol, attr)
+
+    def addstr(self, row, column, text, attr=0):
+        if not 0 <= row < self._rows_number:
+            return
+        text = text[:max(self._columns_number - column, 0)]
+        self.compositor.addstr(
+            self.begin_row + row,
+            self.begin_column + column,
+            text,
+            attr,
+        )
@@ -1,3 +1,7 @@
+import curses
+
+from sprites import Sprite
+
 SPACE_KEY_CODE = 32
 LEFT_KEY_CODE = 260
 RIGHT_KEY_CODE = 261
@@ -36,45 +40,67 @@ def read_controls(canvas):
     return rows_direction, columns_direction, space_pressed
 
 
-def draw_frame(canvas, start_row, start_column, text, negative=False):
-    """Draw multiline text fragment on canvas,
+def beep():
+    """Beep, do nothing if the terminal is not initialized,
+    e.g. the game runs headless."""
+
+    try:
+        curses.beep()
+    except curses.error:
+        pass
+
+
+def draw_frame(canvas, start_row, start_column, frame, negative=False):
+    """Draw multiline text fragment or sprite on canvas,
     erase text instead of drawing if negative=True is specified."""
 
+    if isinstance(frame, str):
+        frame = Sprite(frame)
+
     rows_number, columns_number = canvas.getmaxyx()
+    start_row = round(start_row)
+    start_column = round(start_column)
 
-    for row, line in enumerate(text.splitlines(), round(start_row)):
+    for frame_row, frame_column, text in frame.runs:
+        row = start_row + frame_row
         if row < 0:
             continue
 
         if row >= rows_number:
             break
 
-        for column, symbol in enumerate(line, round(start_column)):
-            if column < 0:
-                continue
-
-            if column >= columns_number:
-                break
-
-            if symbol == ' ':
-                continue
-
-            # Check that current position it is not in a lower right corner
-            # of the window
-            # Curses will raise exception in that case. Don`t ask why…
-            # https://docs.python.org/3/library/curses.html#curses.window.addch
-            if row == rows_number - 1 and column == columns_number - 1:
-                continue
+        column = start_column + frame_column
+        end_column = column + len(text)
+
+        # Check that current position it is not in a lower right corner
+        # of the window
+        # Curses will raise exception in that case. Don`t ask why…
+        # https://docs.python.org/3/library/curses.html#curses.window.addch
+        max_end_column = columns_number
+        if row == rows_number - 1:
+            max_end_column -= 1
+
+        if column < 0:
+            text = text[-column:]
+            column = 0
+        if end_column > max_end_column:
+            text = text[:max_end_column - end_column]
+        if not text:
+            continue
 
-            symbol = symbol if not negative else ' '
-            canvas.addch(row, column, symbol)
+        if negative:
+            text = ' ' * len(text)
+        canvas.addstr(row, column, text)
 
 
-def get_frame_size(text):
-    """Calculate size of multiline text fragment,
+def get_frame_size(frame):
+    """Calculate size of multiline text fragment or sprite,
     return pair — number of rows and colums."""
 
-    lines = text.splitlines()
+    if isinstance(frame, Sprite):
+        return frame.rows_size, frame.columns_size
+
+    lines = frame.splitlines()
     rows = len(lines)
     columns = max([len(line) for line in lines])
     return rows, columns
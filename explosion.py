@@ -1,6 +1,6 @@
-import asyncio
-import curses
-from curses_tools import draw_frame, get_frame_size
+from curses_tools import beep, draw_frame, get_frame_size
+from pools import Pool
+from sprites import Sprite
 
 EXPLOSION_FRAMES = [
     """\
@@ -29,17 +29,89 @@ EXPLOSION_FRAMES = [
     """,
 ]
 
+EXPLOSION_SPRITES = [Sprite(frame) for frame in EXPLOSION_FRAMES]
 
-async def explode(canvas, center_row, center_column):
-    rows, columns = get_frame_size(EXPLOSION_FRAMES[0])
-    corner_row = center_row - rows / 2
-    corner_column = center_column - columns / 2
 
-    curses.beep()
-    for frame in EXPLOSION_FRAMES:
+class Explosion:
+    """Explosion state: corner of frames and number of the step made."""
 
-        draw_frame(canvas, corner_row, corner_column, frame)
+    __slots__ = ('corner_row', 'corner_column', 'step')
 
-        await asyncio.sleep(0)
-        draw_frame(canvas, corner_row, corner_column, frame, negative=True)
-        await asyncio.sleep(0)
+    def __init__(self, center_row, center_column):
+        self.reset(center_row, center_column)
+
+    def reset(self, center_row, center_column):
+        rows, columns = get_frame_size(EXPLOSION_SPRITES[0])
+        self.corner_row = center_row - rows / 2
+        self.corner_column = center_column - columns / 2
+        self.step = 0
+
+
+class Explosions:
+    """Explosions drawn together by one coroutine.
+
+    Every frame is shown for a tick and erased on the next one, a finished
+    explosion goes back to the pool.
+    """
+
+    def __init__(self, pool_size=256):
+        self.pool = Pool(Explosion, pool_size)
+        self._explosions = []
+
+    def __len__(self):
+        return len(self._explosions)
+
+    def explode(self, center_row, center_column):
+        """Add an explosion, it is drawn on the next update."""
+
+        self._explosions.append(
+            self.pool.acquire(center_row, center_column)
+        )
+
+    def dump(self):
+        """Return states of explosions as tuples, e.g. for a snapshot."""
+
+        return [
+            (explosion.corner_row, explosion.corner_column, explosion.step)
+            for explosion in self._explosions
+        ]
+
+    def load(self, states):
+        """Add explosions of `dump` states."""
+
+        for corner_row, corner_column, step in states:
+            explosion = self.pool.acquire(0, 0)
+            explosion.corner_row = corner_row
+            explosion.corner_column = corner_column
+            explosion.step = step
+            self._explosions.append(explosion)
+
+    def update(self, canvas):
+        steps_number = len(EXPLOSION_SPRITES) * 2
+        explosions = []
+        for explosion in self._explosions:
+            frame = EXPLOSION_SPRITES[explosion.step // 2]
+            if explosion.step % 2:
+                draw_frame(
+                    canvas,
+                    explosion.corner_row,
+                    explosion.corner_column,
+                    frame,
+                    negative=True,
+                )
+            else:
+                if not explosion.step:
+                    beep()
+                draw_frame(
+                    canvas,
+                    explosion.corner_row,
+                    explosion.corner_column,
+                    frame,
+                )
+
+            explosion.step += 1
+            if explosion.step < steps_number:
+                explosions.append(explosion)
+            else:
+                self.pool.release(explosion)
+        self._explosions = explosions
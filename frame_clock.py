@@ -0,0 +1,88 @@
+import time
+
+
+class FrameClock:
+    """Fixed timestep clock of the game loop.
+
+    Tics are planned at a fixed rate: the clock sleeps only the time left
+    from the tick budget, so the tick cost does not slow the game down.
+    When the game is behind the plan, `should_render` skips screen updates
+    to catch up, but at most max_skipped_renders in a row.
+
+    tick_rate — tics per second, None runs tics as fast as possible.
+    """
+
+    def __init__(
+        self,
+        tick_rate=10,
+        max_skipped_renders=5,
+        max_lag_tics=10,
+        timer=time.perf_counter,
+        sleep=time.sleep
+    ):
+        self.tick_duration = 1 / tick_rate if tick_rate else 0
+        self.max_skipped_renders = max_skipped_renders
+        self.max_lag_tics = max_lag_tics
+        self._timer = timer
+        self._sleep = sleep
+
+        self._next_tick_time = timer()
+        self._tick_started_at = self._next_tick_time
+        self._skipped_renders = 0
+
+        self.fps = 0
+        self.frame_time = 0
+        self._renders = 0
+        self._work_time = 0
+        self._tics = 0
+        self._measure_started_at = self._next_tick_time
+
+    def should_render(self):
+        """Return False when the game is behind the plan
+        and a render may be skipped."""
+
+        behind = self._timer() > self._next_tick_time + self.tick_duration
+        if (
+            self.tick_duration
+            and behind
+            and self._skipped_renders < self.max_skipped_renders
+        ):
+            self._skipped_renders += 1
+            return False
+
+        self._skipped_renders = 0
+        self._renders += 1
+        return True
+
+    def wait(self):
+        """Sleep until the next tick, measure frame time and FPS."""
+
+        delay = self.plan_next_tick()
+        if delay:
+            self._sleep(delay)
+        self.start_tick()
+
+    def start_tick(self):
+        self._tick_started_at = self._timer()
+
+    def plan_next_tick(self):
+        """Measure frame time and FPS,
+        return time in seconds left until the next tick."""
+
+        now = self._timer()
+        self._work_time += now - self._tick_started_at
+        self._tics += 1
+
+        measure_duration = now - self._measure_started_at
+        if measure_duration >= 1:
+            self.fps = self._renders / measure_duration
+            self.frame_time = self._work_time / self._tics
+            self._renders = self._work_time = self._tics = 0
+            self._measure_started_at = now
+
+        self._next_tick_time += self.tick_duration
+        if now - self._next_tick_time > self.max_lag_tics * self.tick_duration:
+            # too far behind the plan to catch up, e.g. the game was paused
+            self._next_tick_time = now
+
+        return max(self._next_tick_time - now, 0)
@@ -1,43 +1,93 @@
+import argparse
 import asyncio
 import curses
-import itertools
+import functools
 import os
 import random
+import signal
 import statistics
-import time
+import sys
+import zlib
 from textwrap import dedent
-from typing import List
 
-from curses_tools import draw_frame, get_frame_size, read_controls
-from explosion import explode
-from game_scenario import PHRASES, get_garbage_delay_tics
-from obstacles import Obstacle
-from physics import update_speed
+from asyncio_runner import AsyncioScheduler, KeyQueue, run_loop
+from assets import load_frames
+from compositor import Compositor
+from curses_tools import beep, draw_frame, get_frame_size, read_controls
+from frame_clock import FrameClock
+from game_scenario import DEFAULT_SCENARIO_PATH
+from physics import ShipPhysics
+from profiler import TickProfiler, show_profile
+from replay import SEEDS, ControlsRecorder
+from scheduler import Scheduler, sleep
+from sprites import Sprite
+from terminal_output import AnsiOutput
+from viewport import Viewport
+from world import Snapshot, Spaceship, World, dump_snapshot, load_snapshot
 
-coroutines = []
-obstacles: List[Obstacle] = []
-obstacles_in_last_collisions: List[Obstacle] = []
-year = 1957
+LAYERS_NAMES = ('background', 'entities', 'hud')
 
+scheduler = Scheduler()
+screen = None
+viewport = None
+# the world of the running game, see world.py
+world = None
 
-async def show_title(canvas):
-    phrase = ''
-    '''Method getmaxyx returns height and width:
-    https://docs.python.org/2/library/curses.html#curses.window.getmaxyx)'''
-    canvas_height, canvas_width = canvas.getmaxyx()
+
+async def show_title(canvas, world, frame_clock=None, shown_settings=None):
+    """Show the year of the world and its event in the lower right corner,
+    FPS and frame time in the lower left corner if frame_clock is given.
+    Windows move with the corners when the viewport is resized.
+
+    shown_settings — settings of the year which title is on the screen
+    already, e.g. restored from a snapshot, the title is erased first.
+    """
     title_max_length = 50
-    start_row = canvas_height - 1
-    start_column = canvas_width - title_max_length
+    title_window = stats_window = None
+
+    def place_windows(viewport, previous_size=None):
+        nonlocal title_window, stats_window
+        start_row = viewport.max_row
+        start_column = viewport.columns_number - title_max_length
+        title_window = canvas.derwin(start_row, start_column)
+        stats_window = canvas.derwin(
+            1, max(start_column - 1, 1), start_row, 1
+        )
+
+    place_windows(viewport)
+    viewport.listeners.append(place_windows)
+    title_sprite = None
+
+    def get_title_sprite(settings):
+        return Sprite(f'Year {settings.year} {settings.phrase}')
 
-    title_window = canvas.derwin(start_row, start_column)
+    def show_year(settings):
+        nonlocal title_sprite
+        title_sprite = get_title_sprite(settings)
+
+    show_year(world.year_settings)
+    world.year_listeners.append(show_year)
+    if shown_settings is not None:
+        draw_frame(title_window, 0, 0, get_title_sprite(shown_settings), True)
+
+    stats = None
+    stats_sprite = Sprite('')
     while True:
-        if year in PHRASES:
-            phrase = PHRASES[year]
-        title = f'Year {year} {phrase}'
-        draw_frame(title_window, 0, 0, title)
-        title_window.refresh()
+        if frame_clock is not None and stats != (
+            frame_clock.fps, frame_clock.frame_time
+        ):
+            stats = frame_clock.fps, frame_clock.frame_time
+            stats_sprite = Sprite(
+                f'{frame_clock.fps:.1f} fps '
+                f'{frame_clock.frame_time * 1000:.1f} ms'
+            )
+        shown_title_sprite = title_sprite
+        shown_title_window, shown_stats_window = title_window, stats_window
+        draw_frame(shown_title_window, 0, 0, shown_title_sprite)
+        draw_frame(shown_stats_window, 0, 0, stats_sprite)
         await asyncio.sleep(0)
-        draw_frame(title_window, 0, 0, title, True)
+        draw_frame(shown_title_window, 0, 0, shown_title_sprite, True)
+        draw_frame(shown_stats_window, 0, 0, stats_sprite, True)
 
 
 async def show_gameover(canvas):
@@ -50,146 +100,408 @@ async def show_gameover(canvas):
     |     ||  |  ||   |   ||     |    |     | \   / |     ||  .  \
     |___,_||__|__||___|___||_____|     \___/   \_/  |_____||__|\_|
     '''
-    game_over_frame = dedent(game_over_frame)
-    '''Method getmaxyx returns height and width:
-    https://docs.python.org/2/library/curses.html#curses.window.getmaxyx)'''
-    canvas_height, canvas_width = canvas.getmaxyx()
-    max_row = canvas_height - 1
-    max_column = canvas_width - 1
-    first_row = first_column = 0
-    central_row = int(statistics.mean([first_row, max_row]))
-    central_column = int(statistics.mean([first_column, max_column]))
+    game_over_frame = Sprite(dedent(game_over_frame))
     game_over_rows, game_over_columns = get_frame_size(game_over_frame)
-    start_row = central_row - game_over_rows / 2
-    start_column = central_column - game_over_columns / 2
+    shown_position = None
 
     while True:
-        draw_frame(canvas, start_row, start_column, game_over_frame)
+        # the frame stays in the center of a resized viewport
+        position = (
+            viewport.central_row - game_over_rows / 2,
+            viewport.central_column - game_over_columns / 2,
+        )
+        if shown_position is not None and position != shown_position:
+            draw_frame(canvas, *shown_position, game_over_frame, True)
+        draw_frame(canvas, *position, game_over_frame)
+        shown_position = position
         await asyncio.sleep(0)
 
 
-async def sleep(tics=1):
-    for _ in range(tics):
-        await asyncio.sleep(0)
+def get_running_tick():
+    """Return the tick coroutines are resumed on,
+    the scheduler counts it before resuming them."""
+
+    return scheduler.tick - 1
+
+
+async def count_years(world, year_duration=15):
+    """Change the year every year_duration tics, the next change is kept
+    in `world.next_year_tick` to snapshot it."""
+
+    if world.next_year_tick is None:
+        world.next_year_tick = get_running_tick() + year_duration
+    while True:
+        await sleep(world.next_year_tick - get_running_tick())
+        world.change_year(world.year + 1)
+        world.next_year_tick += year_duration
+
+
+async def fill_orbit_with_garbage(canvas, world, frames_bundle):
+    """Launch garbage, frames of a group are loaded from the bundle
+    only when the group appears in the scenario, e.g. satellites.
+    The next launch is kept in `world.next_garbage_tick` to snapshot it."""
+    # frame id (group name, index in the group) and the frame
+    obstacles_frames = []
+    frames_groups = None
 
+    def load_frames_groups(settings):
+        nonlocal frames_groups
+        if settings.frames_groups == frames_groups:
+            return
+        frames_groups = settings.frames_groups
+        obstacles_frames[:] = [
+            ((group_name, index), frame)
+            for group_name in frames_groups
+            for index, frame in enumerate(
+                frames_bundle.get_group(group_name)
+            )
+        ]
 
-async def fill_orbit_with_garbage(
+    load_frames_groups(world.year_settings)
+    world.year_listeners.append(load_frames_groups)
+
+    while True:
+        await sleep(world.next_garbage_tick - get_running_tick())
+        year_settings = world.year_settings
+        garbage_delay_tics = year_settings.garbage_delay_tics
+        if not garbage_delay_tics:
+            world.next_garbage_tick = get_running_tick() + 1
+            continue
+        for _ in range(year_settings.garbage_per_launch):
+            column = world.random.randint(0, viewport.max_column)
+            frame_id, frame = world.random.choice(obstacles_frames)
+            scheduler.spawn(
+                fly_garbage(canvas, world, column, frame, frame_id=frame_id)
+            )
+        world.next_garbage_tick = get_running_tick() + garbage_delay_tics
+
+
+async def fly_garbage(
     canvas,
-    trash_frames,
-    satellites_frames,
-    max_column
+    world,
+    column,
+    garbage_frame,
+    speed=0.5,
+    frame_id=None,
+    obstacle=None
 ):
-    obstacles_frames = [*trash_frames]
+    """Animate garbage of the world, flying from top to bottom.
+    Сolumn position will stay same, as specified on start.
+
+    frame_id — group name and index of the frame, kept for snapshots.
+    obstacle — registered obstacle of garbage restored from a snapshot,
+    the garbage is drawn at its position already.
+    """
+    if world.batch_simulation is not None:
+        await fly_batch_garbage(canvas, world, column, garbage_frame, speed)
+        return
+
+    rows_size, columns_size = get_frame_size(garbage_frame)
+    drawn = obstacle is not None
+    if obstacle is None:
+        column = max(column, 0)
+        column = min(column, viewport.max_column)
+        obstacle = world.add_garbage(
+            0, column, rows_size, columns_size, frame_id, speed
+        )
+    row, column = obstacle.row, obstacle.column
+    center_column = round(column + columns_size / 2)
+
     while True:
-        garbage_delay_tics = get_garbage_delay_tics(year)
-        if not garbage_delay_tics:
+        if not drawn:
+            if row >= viewport.rows_number:
+                break
+            if obstacle.hit:
+                center_row = round(row + rows_size / 2)
+                world.explosions.explode(center_row, center_column)
+                world.game_stats['destroyed'] += 1
+                break
+
+            draw_frame(canvas, row, column, garbage_frame)
+
             await asyncio.sleep(0)
-            continue
-        if year == 1990:
-            obstacles_frames += satellites_frames
-        column = random.randint(0, max_column)
-        frame = random.choice(obstacles_frames)
-        coroutines.append(fly_garbage(canvas, column, frame))
-        await sleep(garbage_delay_tics)
+        drawn = False
+        draw_frame(canvas, row, column, garbage_frame, negative=True)
+        row += speed
+        if column > viewport.max_column:
+            # the viewport has shrunk, keep the garbage on the screen
+            column = viewport.max_column
+            center_column = round(column + columns_size / 2)
+        obstacle.move(row, column)
+        world.obstacles_grid.move(obstacle)
 
+    world.remove_garbage(obstacle)
 
-async def fly_garbage(canvas, column, garbage_frame, speed=0.5):
-    """Animate garbage, flying from top to bottom.
-    Сolumn position will stay same, as specified on start."""
-    '''Method getmaxyx returns height and width:
-    https://docs.python.org/2/library/curses.html#curses.window.getmaxyx)'''
-    rows_number, columns_number = canvas.getmaxyx()
 
+async def fly_batch_garbage(canvas, world, column, garbage_frame, speed=0.5):
+    """Animate garbage moved by the batch simulation of the world."""
     column = max(column, 0)
-    column = min(column, columns_number - 1)
+    column = min(column, viewport.max_column)
     rows_size, columns_size = get_frame_size(garbage_frame)
     row = 0
     center_column = round(column + columns_size / 2)
-    obstacle = Obstacle(row, column, rows_size, columns_size)
-    obstacles.append(obstacle)
+    slot = world.batch_simulation.add_obstacle(
+        row, column, rows_size, columns_size, speed
+    )
+    batch_obstacles = world.batch_simulation.obstacles
 
-    while row < rows_number:
-        if obstacle in obstacles_in_last_collisions:
-            obstacles_in_last_collisions.remove(obstacle)
+    while row < viewport.rows_number:
+        if batch_obstacles.hit[slot]:
             center_row = round(row + rows_size / 2)
-            coroutines.append(explode(canvas, center_row, center_column))
+            world.explosions.explode(center_row, center_column)
+            world.game_stats['destroyed'] += 1
             break
 
         draw_frame(canvas, row, column, garbage_frame)
 
         await asyncio.sleep(0)
         draw_frame(canvas, row, column, garbage_frame, negative=True)
-        row += speed
-        obstacle.row = row
+        row = float(batch_obstacles.row[slot])
+        if column > viewport.max_column:
+            column = viewport.max_column
+            center_column = round(column + columns_size / 2)
+            batch_obstacles.column[slot] = column
 
-    obstacles.remove(obstacle)
+    batch_obstacles.remove(slot)
 
 
 async def animate_spaceship(
         canvas,
-        start_row,
-        start_column,
-        max_row,
-        max_column,
-        rocket_frames):
+        world,
+        spaceship,
+        rocket_frames,
+        controls_reader=read_controls,
+        restored=False):
+    """Move the spaceship by controls, its state is kept in spaceship,
+    a `world.Spaceship`. A restored spaceship is drawn already.
+    The spaceship flies on after it has crashed if `world.keep_flying`,
+    the game is over all the same.
+    """
     rocket_rows, rocket_columns = get_frame_size(rocket_frames[0])
-    max_rocket_row = max_row - rocket_rows
-    max_rocket_column = max_column - rocket_columns
     rocket_central_column = statistics.median(
         list(range(1, rocket_columns + 1))
     )
 
-    row_speed = column_speed = 0
-    gun_appearance_year = 2020
+    ship_physics = ShipPhysics(row_speed_limit=4, column_speed_limit=4)
 
-    for rocket_frame in itertools.cycle(rocket_frames):
-        draw_frame(canvas, start_row, start_column, rocket_frame)
+    if not restored:
+        draw_frame(
+            canvas,
+            spaceship.row,
+            spaceship.column,
+            rocket_frames[spaceship.frame_number],
+        )
         await asyncio.sleep(0)
-        rows_direction, columns_direction, space_pressed = read_controls(
+
+    while True:
+        rows_direction, columns_direction, space_pressed = controls_reader(
             canvas
         )
 
-        draw_frame(canvas, start_row, start_column, rocket_frame, True)
+        draw_frame(
+            canvas,
+            spaceship.row,
+            spaceship.column,
+            rocket_frames[spaceship.frame_number],
+            True,
+        )
 
-        row_speed, column_speed = update_speed(
-            row_speed,
-            column_speed,
+        previous_row, previous_column = spaceship.row, spaceship.column
+        row_speed, column_speed = ship_physics.update_speed(
+            spaceship.row_speed,
+            spaceship.column_speed,
             rows_direction,
             columns_direction,
-            row_speed_limit=4,
-            column_speed_limit=4
         )
+        spaceship.row_speed, spaceship.column_speed = row_speed, column_speed
 
-        start_row = round(start_row + row_speed)
-        start_column = round(start_column + column_speed)
+        start_row = round(spaceship.row + row_speed)
+        start_column = round(spaceship.column + column_speed)
 
+        # the spaceship is kept on the screen when the viewport shrinks
+        max_rocket_row = viewport.max_row - rocket_rows
+        max_rocket_column = viewport.max_column - rocket_columns
         start_row = max(start_row, 1)
         start_row = min(start_row, max_rocket_row)
         start_column = max(start_column, 1)
         start_column = min(start_column, max_rocket_column)
+        spaceship.row, spaceship.column = start_row, start_column
 
-        if space_pressed and year >= gun_appearance_year:
+        if space_pressed and world.year_settings.gun_available:
             fire_start_column = start_column + rocket_central_column - 1
-            coroutines.append(fire(canvas, start_row, fire_start_column, -1))
+            fire(canvas, world, start_row, fire_start_column, -1)
+            world.game_stats['shots'] += 1
+
+        if world.batch_simulation is not None:
+            if world.batch_simulation.has_obstacle_collision(
+                start_row,
+                start_column,
+                rocket_rows,
+                rocket_columns,
+                previous_row,
+                previous_column,
+            ):
+                crash_spaceship(canvas, world, spaceship)
+                if not world.keep_flying:
+                    return
 
-        for obstacle in obstacles:
-            if obstacle.has_collision(
-                start_row, start_column, rocket_rows, rocket_columns
+        candidates = world.obstacles_grid.query_segment(
+            previous_row,
+            previous_column,
+            start_row,
+            start_column,
+            rocket_rows,
+            rocket_columns,
+        )
+        for obstacle in candidates:
+            if obstacle.has_swept_collision(
+                previous_row,
+                previous_column,
+                start_row,
+                start_column,
+                rocket_rows,
+                rocket_columns,
             ):
-                coroutines.append(show_gameover(canvas))
-                return
+                crash_spaceship(canvas, world, spaceship)
+                if not world.keep_flying:
+                    return
+                break
+
+        spaceship.frame_number = (
+            (spaceship.frame_number + 1) % len(rocket_frames)
+        )
+        draw_frame(
+            canvas,
+            start_row,
+            start_column,
+            rocket_frames[spaceship.frame_number],
+        )
+        await asyncio.sleep(0)
+
+
+def crash_spaceship(canvas, world, spaceship):
+    """The game is over on the first crash of a spaceship."""
+
+    if not spaceship.crashed:
+        spaceship.crashed = True
+        finish_game(canvas, world)
+
+
+def snapshot():
+    """Return the game state as bytes, see world.py. Call it between
+    tics, e.g. from `on_tick` of `draw`."""
+
+    return dump_snapshot(Snapshot(
+        world, scheduler.tick, viewport.get_size(), screen.dump_layers()
+    ))
+
+
+def restore_garbage(canvas, world, frames_bundle):
+    """Spawn coroutines of garbage of a restored world in order of
+    launch."""
+
+    for uid, obstacle in sorted(world.obstacles.items()):
+        frame_id, speed = world.garbage_params[uid]
+        group_name, index = frame_id
+        scheduler.spawn(fly_garbage(
+            canvas,
+            world,
+            obstacle.column,
+            frames_bundle.get_group(group_name)[index],
+            speed,
+            frame_id,
+            obstacle,
+        ))
 
 
-async def fire(
+def resize_screen(viewport, previous_size):
+    screen.resize(*viewport.get_size())
+
+
+def resize_terminal(viewport, previous_size):
+    """Resize curses structures to the new size of the terminal."""
+
+    curses.resizeterm(viewport.rows_number, viewport.columns_number)
+
+
+def record_resize(recorder, viewport, previous_size):
+    """Write the resize to the session log to replay it, the size has
+    been requested after the last tick."""
+
+    recorder.add_resize(scheduler.tick, *viewport.get_size())
+
+
+def request_terminal_resize(signal_number, frame):
+    """SIGWINCH handler, the viewport is resized on the next tick."""
+
+    columns_number, rows_number = os.get_terminal_size(
+        sys.__stdout__.fileno()
+    )
+    viewport.request_resize(rows_number, columns_number)
+
+
+def finish_game(canvas, world):
+    """Show game over on the top layer of the screen, canvas is used
+    if there is no screen."""
+    world.game_stats['game_over_tick'] = scheduler.tick - 1
+    if screen is not None:
+        canvas = screen.get_layer('hud')
+    scheduler.spawn(show_gameover(canvas))
+
+
+def fire(
     canvas,
+    world,
     start_row,
     start_column,
     rows_speed=-0.3,
     columns_speed=0
 ):
-    """Display animation of gun shot, direction and speed can be specified."""
+    """Launch a gun shot in the world, direction and speed can be
+    specified. Shots are drawn by `fly_projectiles`."""
+    if world.batch_simulation is not None:
+        scheduler.spawn(fire_batch(
+            canvas,
+            world.batch_simulation,
+            start_row,
+            start_column,
+            rows_speed,
+            columns_speed,
+        ))
+        return
+
+    world.projectiles.launch(
+        start_row, start_column, rows_speed, columns_speed
+    )
+
+
+async def fly_projectiles(canvas, world):
+    while True:
+        world.projectiles.update(canvas, world.obstacles_grid)
+        await asyncio.sleep(0)
+
+
+async def show_explosions(canvas, explosions):
+    while True:
+        explosions.update(canvas)
+        await asyncio.sleep(0)
+
+
+async def fire_batch(
+    canvas,
+    batch_simulation,
+    start_row,
+    start_column,
+    rows_speed=-0.3,
+    columns_speed=0
+):
+    """Display gun shot flash and launch the shot in the batch simulation,
+    flying shots are drawn by `draw_batch_projectiles`."""
 
     row, column = start_row, start_column
+    slot = batch_simulation.add_projectile(
+        row, column, rows_speed, columns_speed
+    )
 
     canvas.addstr(round(row), round(column), '*')
     await asyncio.sleep(0)
@@ -198,143 +510,518 @@ async def fire(
     await asyncio.sleep(0)
     canvas.addstr(round(row), round(column), ' ')
 
-    row += rows_speed
-    column += columns_speed
+    batch_simulation.launch(slot)
+    beep()
 
-    symbol = '-' if columns_speed else '|'
-    '''Method getmaxyx returns height and width:
-    https://docs.python.org/2/library/curses.html#curses.window.getmaxyx)'''
-    rows, columns = canvas.getmaxyx()
-    max_row, max_column = rows - 1, columns - 1
 
-    curses.beep()
+async def draw_batch_projectiles(canvas, batch_simulation):
+    """Draw all shots flying in the batch simulation."""
 
-    while 0 < row < max_row and 0 < column < max_column:
-        canvas.addstr(round(row), round(column), symbol)
+    while True:
+        rows, columns, horizontal = batch_simulation.get_flying_projectiles()
+        vertical = ~horizontal
+        canvas.addpoints(
+            rows[vertical].tolist(), columns[vertical].tolist(), '|'
+        )
+        canvas.addpoints(
+            rows[horizontal].tolist(), columns[horizontal].tolist(), '-'
+        )
         await asyncio.sleep(0)
-        canvas.addstr(round(row), round(column), ' ')
-        row += rows_speed
-        column += columns_speed
-        for obstacle in obstacles:
-            if obstacle.has_collision(round(row), round(column)):
-                obstacles_in_last_collisions.append(obstacle)
-                return
+        canvas.addpoints(rows.tolist(), columns.tolist(), ' ')
+
 
+async def fire_stress(canvas, world):
+    """Fire `world.stress_shots` shots from random columns of the bottom
+    row every tick."""
 
-async def blink(canvas, row, column, offset_tics, symbol='*'):
+    batch_simulation = world.batch_simulation
     while True:
-        canvas.addstr(row, column, symbol, curses.A_DIM)
-        await sleep(offset_tics)
+        for _ in range(world.stress_shots):
+            row = viewport.max_row - 1
+            column = world.random.randint(1, viewport.max_column - 1)
+            if batch_simulation is None:
+                fire(canvas, world, row, column)
+                continue
+            batch_simulation.launch(
+                batch_simulation.add_projectile(row, column)
+            )
+        await asyncio.sleep(0)
 
-        canvas.addstr(row, column, symbol)
-        await sleep(3)
 
-        canvas.addstr(row, column, symbol, curses.A_BOLD)
-        await sleep(5)
+def get_stars_number(world, symbols_number):
+    min_stars_ratio = 0.02
+    max_stars_ratio = 0.04
+    return world.random.randint(
+        int(symbols_number * min_stars_ratio),
+        int(symbols_number * max_stars_ratio)
+    )
 
-        canvas.addstr(row, column, symbol)
-        await sleep(3)
 
+def add_stars(
+    world,
+    first_row,
+    first_column,
+    last_row,
+    last_column,
+    stars_number=None
+):
+    """Scatter stars of the world over rows first_row..last_row and columns
+    first_column..last_column, their number depends on the area
+    unless stars_number is given."""
 
-def get_frames_from_folder(frames_folder_name):
-    frames = []
-    files_names = os.listdir(frames_folder_name)
-    for file_name in files_names:
-        file_path = os.path.join(frames_folder_name, file_name)
-        with open(file_path, 'r') as frame_file:
-            frame = frame_file.read()
-            frames.append(frame)
+    if last_row < first_row or last_column < first_column:
+        return
+    if stars_number is None:
+        stars_number = get_stars_number(
+            world,
+            (last_row - first_row + 1) * (last_column - first_column + 1),
+        )
+
+    for _ in range(stars_number):
+        row = world.random.randint(first_row, last_row)
+        column = world.random.randint(first_column, last_column)
+        symbol = world.random.choice('+*.:')
+        min_offset_tics = 20
+        max_offset_tics = 40
+        offset_tics = world.random.randint(min_offset_tics, max_offset_tics)
+        world.starfield.add_star(row, column, symbol, offset_tics)
+
+
+def relayout_stars(world, viewport, previous_size):
+    """Remove stars out of the resized viewport, add stars only to
+    the area which has been exposed."""
+
+    previous_rows_number, previous_columns_number = previous_size
+    previous_max_game_area_row = previous_rows_number - 2
+    previous_max_game_area_column = previous_columns_number - 2
+    max_game_area_row = viewport.max_row - 1
+    max_game_area_column = viewport.max_column - 1
+
+    world.starfield.crop(max_game_area_row, max_game_area_column)
+    # right of the previous area
+    add_stars(
+        world,
+        1,
+        previous_max_game_area_column + 1,
+        min(previous_max_game_area_row, max_game_area_row),
+        max_game_area_column,
+    )
+    # below the previous area
+    add_stars(
+        world,
+        previous_max_game_area_row + 1,
+        1,
+        max_game_area_row,
+        max_game_area_column,
+    )
 
-    return frames
 
+async def blink_stars(canvas, starfield):
+    while True:
+        starfield.update(canvas)
+        await asyncio.sleep(0)
+
+
+def draw(
+    canvas,
+    batch=False,
+    stress_shots=0,
+    seed=None,
+    tick_rate=10,
+    show_fps=False,
+    start_year=1957,
+    end_year=None,
+    tics_limit=None,
+    on_tick=None,
+    use_asyncio=False,
+    profile_path=None,
+    profile_overlay=False,
+    controls_reader=read_controls,
+    record_path=None,
+    stop_on_game_over=False,
+    ansi_output=False,
+    scenario_path=DEFAULT_SCENARIO_PATH,
+    controls_readers=None,
+    output=None,
+    services=(),
+    watch_resize=False,
+    snapshot=None,
+    keep_flying=False
+):
+    """Run the game. It never ends unless end_year, tics_limit or
+    stop_on_game_over is specified.
 
-def draw(canvas):
-    global year
-    curses.curs_set(False)
+    tick_rate — tics per second, None runs the game as fast as possible,
+    e.g. headless.
+    on_tick — function called after every tick with no arguments,
+    e.g. to measure the tick duration.
+    use_asyncio — run the game on an asyncio event loop, read keys as soon
+    as they arrive.
+    profile_path — file to dump records of the last tics on exit,
+    profile_overlay — show records of the last tick over the game.
+    watch_resize — resize the game with the terminal on SIGWINCH.
+    controls_reader — replacement of read_controls, e.g. a replay.
+    record_path — file to record the session log, see replay.py, not
+    combined with batch, stress_shots or keep_flying.
+    stop_on_game_over — finish the game when the spaceship crashes,
+    e.g. in simulations.
+    ansi_output — send changes of a tick to the terminal with one write
+    of escape sequences instead of curses.
+    scenario_path — file of the scenario, see game_scenario.py.
+    controls_readers — list of controls readers, a spaceship per reader,
+    e.g. pilots connected to a server, replaces controls_reader.
+    output — backend of the screen with `terminal_output` interface,
+    e.g. a server streaming the screen, replaces ansi_output.
+    services — coroutines running on the asyncio loop along with the game,
+    e.g. a server. Keys are not read from stdin then.
+    snapshot — bytes of `snapshot()` to resume the game from, the screen
+    size should be the same. The game goes on with the scenario, stress
+    shots and keep_flying of the snapshot, start_year, seed, scenario_path,
+    stress_shots and keep_flying are not used then.
+    keep_flying — spaceships fly on after crashes, e.g. to load-test late
+    years with the autopilot. The first crash is the game over all the
+    same.
+
+    Return the game outcome: tics played, the last year, game over tick,
+    shots fired, garbage destroyed and a checksum of the last screen.
+    """
+    global scheduler, screen, viewport, world
+    try:
+        curses.curs_set(False)
+    except curses.error:
+        # the terminal does not support invisible cursor or is not initialized
+        pass
     canvas.nodelay(True)
 
+    if seed is None and record_path:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    profiler = None
+    if profile_path or profile_overlay:
+        profiler = TickProfiler()
+        canvas = profiler.wrap_canvas(canvas)
+
+    if services and not use_asyncio:
+        raise ValueError('Services run on the asyncio loop only.')
+    if record_path and controls_readers is not None:
+        raise ValueError('Session of several spaceships is not recorded.')
+    if record_path and (batch or stress_shots or keep_flying):
+        # the log has no place for them, a replay would play another game
+        raise ValueError(
+            'Session simulated in batches, under stress or with spaceships '
+            'flying on after crashes is not recorded.'
+        )
+    saved_game = None
+    if snapshot is not None:
+        if record_path or batch:
+            raise ValueError(
+                'A restored game is not recorded or simulated in batches.'
+            )
+        saved_game = load_snapshot(snapshot)
+        if saved_game.size != canvas.getmaxyx():
+            raise ValueError(
+                f'The snapshot is of {saved_game.size} screen, '
+                f'not {canvas.getmaxyx()}.'
+            )
+        world = saved_game.world
+    else:
+        world = World(
+            scenario_path, seed, start_year, stress_shots, keep_flying, batch
+        )
+
+    if output is None and ansi_output:
+        # curses redraws a touched window on getch, so sync it once
+        canvas.refresh()
+        output = AnsiOutput()
+        if profiler is not None:
+            # the screen is written past the counted curses window
+            profiler.count_output(output)
+
+    key_queue = None
+    if use_asyncio:
+        scheduler = AsyncioScheduler()
+        if services:
+            screen = Compositor(canvas, output, LAYERS_NAMES)
+        else:
+            key_queue = KeyQueue(canvas)
+            screen = Compositor(key_queue, output, LAYERS_NAMES)
+    else:
+        scheduler = Scheduler()
+        screen = Compositor(canvas, output, LAYERS_NAMES)
+    scheduler.profiler = profiler
+
     '''Method getmaxyx returns height and width:
     https://docs.python.org/2/library/curses.html#curses.window.getmaxyx)'''
     canvas_height, canvas_width = canvas.getmaxyx()
-    max_row = canvas_height - 1
-    max_column = canvas_width - 1
+    viewport = Viewport(canvas_height, canvas_width)
+    if watch_resize:
+        viewport.listeners.append(resize_terminal)
+    viewport.listeners.append(resize_screen)
 
+    recorder = None
+    if record_path:
+        recorder = ControlsRecorder(
+            record_path,
+            seed,
+            canvas_height,
+            canvas_width,
+            start_year,
+            controls_reader,
+            scenario_path,
+        )
+        controls_reader = recorder
+        viewport.listeners.append(functools.partial(record_resize, recorder))
+
+    frames_bundle = load_frames()
     rocket_frames = []
-    frames_folder_name = 'frames/rocket'
-    files_names = os.listdir(frames_folder_name)
-    for file_name in files_names:
-        file_path = os.path.join(frames_folder_name, file_name)
-        with open(file_path, 'r') as frame_file:
-            frame = frame_file.read()
-            for _ in range(2):
-                rocket_frames.append(frame)
-
-    trash_frames = get_frames_from_folder('frames/trash')
-    satellites_frames = get_frames_from_folder('frames/satellites')
-
-    first_row = first_column = 0
-    central_row = int(statistics.mean([first_row, max_row]))
-    central_column = int(statistics.mean([first_column, max_column]))
-
-    max_symbols = max_row * max_column
-    min_stars_ratio = 0.02
-    max_stars_ratio = 0.04
-    stars_number = random.randint(
-        int(max_symbols * min_stars_ratio),
-        int(max_symbols * max_stars_ratio)
-    )
+    for frame in frames_bundle.get_group('rocket'):
+        for _ in range(2):
+            rocket_frames.append(frame)
 
-    min_game_area_row = min_game_area_column = 1
-    max_game_area_row = max_row - 1
-    max_game_area_column = max_column - 1
-    for _ in range(stars_number):
-        row = random.randint(min_game_area_row, max_game_area_row)
-        column = random.randint(min_game_area_column, max_game_area_column)
-        symbol = random.choice('+*.:')
-        min_offset_tics = 20
-        max_offset_tics = 40
-        offset_tics = random.randint(min_offset_tics, max_offset_tics)
-        coroutines.append(blink(canvas, row, column, offset_tics, symbol))
+    if saved_game is None:
+        stars_number = get_stars_number(
+            world, viewport.max_row * viewport.max_column
+        )
+        add_stars(
+            world,
+            1,
+            1,
+            viewport.max_row - 1,
+            viewport.max_column - 1,
+            stars_number,
+        )
+    else:
+        scheduler.tick = saved_game.tick
 
-    coroutines.append(
-        animate_spaceship(
-            canvas,
-            central_row,
-            central_column,
-            max_row,
-            max_column,
-            rocket_frames
+    scheduler.spawn(count_years(world))
+
+    viewport.listeners.append(functools.partial(relayout_stars, world))
+    background = screen.get_layer('background')
+    entities = screen.get_layer('entities')
+    hud = screen.get_layer('hud')
+    scheduler.spawn(blink_stars(background, world.starfield))
+    scheduler.spawn(fly_projectiles(entities, world))
+    scheduler.spawn(show_explosions(entities, world.explosions))
+
+    if controls_readers is None:
+        controls_readers = [controls_reader]
+    if saved_game is None:
+        ships_number = len(controls_readers)
+        ships_spacing = canvas_width // (ships_number + 1)
+        world.spaceships = [
+            Spaceship(
+                viewport.central_row,
+                viewport.central_column + round(
+                    (ship_number - (ships_number - 1) / 2) * ships_spacing
+                ),
+            )
+            for ship_number in range(ships_number)
+        ]
+    for spaceship, ship_controls_reader in zip(
+        world.spaceships, controls_readers
+    ):
+        if spaceship.crashed and not world.keep_flying:
+            continue
+        scheduler.spawn(
+            animate_spaceship(
+                entities,
+                world,
+                spaceship,
+                rocket_frames,
+                ship_controls_reader,
+                restored=saved_game is not None,
+            )
         )
-    )
 
-    coroutines.append(
-        fill_orbit_with_garbage(
-            canvas,
-            trash_frames,
-            satellites_frames,
-            max_column
+    scheduler.spawn(fill_orbit_with_garbage(entities, world, frames_bundle))
+
+    frame_clock = FrameClock(tick_rate)
+    scheduler.spawn(show_title(
+        hud,
+        world,
+        frame_clock if show_fps else None,
+        None if saved_game is None else world.year_settings,
+    ))
+
+    if world.batch_simulation is not None:
+        scheduler.spawn(
+            draw_batch_projectiles(entities, world.batch_simulation)
         )
-    )
 
-    coroutines.append(show_title(canvas))
+    if world.stress_shots:
+        scheduler.spawn(fire_stress(entities, world))
 
-    year_tics = 0
-    year_duration = 15
-    while True:
-        for coroutine in coroutines.copy():
-            try:
-                coroutine.send(None)
-            except StopIteration:
-                coroutines.remove(coroutine)
+    if profile_overlay:
+        scheduler.spawn(show_profile(hud, profiler))
 
-        canvas.refresh()
-        time.sleep(0.1)
-        year_tics += 1
-        if year_tics == year_duration:
-            year_tics = 0
-            year += 1
+    if saved_game is not None:
+        restore_garbage(entities, world, frames_bundle)
+        if world.game_stats['game_over_tick'] >= 0:
+            scheduler.spawn(show_gameover(hud))
+        screen.load_layers(saved_game.layers_cells)
+
+    def run_tick():
+        if profiler is not None:
+            profiler.start_tick()
+        viewport.update()
+        if world.batch_simulation is not None:
+            world.batch_simulation.step(
+                viewport.rows_number, viewport.columns_number
+            )
+        scheduler.run_tick()
+
+    def render():
+        if frame_clock.should_render():
+            screen.flush()
+        if profiler is not None:
+            obstacles_number = len(world.obstacles)
+            if world.batch_simulation is not None:
+                obstacles_number += len(world.batch_simulation.obstacles)
+            profiler.finish_tick(
+                scheduler.tick,
+                len(scheduler),
+                obstacles_number,
+                {
+                    'obstacles': world.obstacles_pool,
+                    'projectiles': world.projectiles.pool,
+                    'explosions': world.explosions.pool,
+                },
+            )
+        if on_tick is not None:
+            on_tick()
+
+    def is_over():
+        if stop_on_game_over and world.game_stats['game_over_tick'] >= 0:
+            return True
+        if end_year is not None and world.year >= end_year:
+            return True
+        return tics_limit is not None and scheduler.tick >= tics_limit
+
+    if watch_resize:
+        previous_sigwinch_handler = signal.signal(
+            signal.SIGWINCH, request_terminal_resize
+        )
+    try:
+        if use_asyncio:
+            asyncio.run(run_loop(
+                scheduler,
+                key_queue,
+                frame_clock,
+                run_tick,
+                render,
+                is_over,
+                services,
+            ))
+        else:
+            while not is_over():
+                run_tick()
+                render()
+                frame_clock.wait()
+    finally:
+        if watch_resize:
+            signal.signal(signal.SIGWINCH, previous_sigwinch_handler)
+        scheduler.close()
+        outcome = {
+            'tics': scheduler.tick,
+            'year': world.year,
+            'screen_checksum': zlib.crc32(screen.get_text().encode()),
+            **world.game_stats,
+        }
+        if profile_path:
+            profiler.dump(profile_path)
+        if recorder is not None:
+            # the game is stopped with Ctrl-C, the log gets the outcome
+            # of the interrupted game
+            recorder.close(outcome)
+
+    return outcome
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Space game')
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='move garbage and shots with the NumPy batch simulation',
+    )
+    parser.add_argument(
+        '--stress',
+        type=int,
+        default=0,
+        metavar='SHOTS',
+        help='fire SHOTS shots every tick to stress the game',
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        help='seed of random numbers to repeat the same game',
+    )
+    parser.add_argument(
+        '--tick-rate',
+        type=float,
+        default=10,
+        help='tics per second, 10 by default',
+    )
+    parser.add_argument(
+        '--asyncio',
+        action='store_true',
+        help='run the game on an asyncio event loop',
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='FILE',
+        help='record the last tics and dump records to FILE on exit',
+    )
+    parser.add_argument(
+        '--profile-overlay',
+        action='store_true',
+        help='show records of the last tick over the game',
+    )
+    parser.add_argument(
+        '--record',
+        metavar='FILE',
+        help='record the session log to FILE to replay it headless',
+    )
+    parser.add_argument(
+        '--scenario',
+        default=DEFAULT_SCENARIO_PATH,
+        metavar='FILE',
+        help='JSON file of the scenario, scenarios/classic.json by default',
+    )
+    parser.add_argument(
+        '--ansi',
+        action='store_true',
+        help='write the screen with raw escape sequences, one write a tick',
+    )
+    parser.add_argument(
+        '--show-fps',
+        action='store_true',
+        help='show FPS and frame time in the lower left corner',
+    )
+    args = parser.parse_args()
+    if args.record and args.seed is not None and args.seed not in SEEDS:
+        parser.error('--seed of a recorded session is a 64-bit integer')
+    if args.record and (args.batch or args.stress):
+        parser.error('--record is not combined with --batch or --stress')
+    return args
 
 
 if __name__ == '__main__':
+    args = parse_args()
     curses.update_lines_cols()
-    curses.wrapper(draw)
+    curses.wrapper(
+        functools.partial(
+            draw,
+            batch=args.batch,
+            stress_shots=args.stress,
+            seed=args.seed,
+            tick_rate=args.tick_rate,
+            show_fps=args.show_fps,
+            use_asyncio=args.asyncio,
+            profile_path=args.profile,
+            profile_overlay=args.profile_overlay,
+            record_path=args.record,
+            ansi_output=args.ansi,
+            scenario_path=args.scenario,
+            watch_resize=True,
+        )
+    )
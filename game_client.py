@@ -0,0 +1,191 @@
+"""Watch or pilot a game streamed by `game_server.py`.
+
+Usage:
+    python game_client.py --host 127.0.0.1 --port 8765
+    python game_client.py --port 8765 --pilot
+
+A pilot steers a spaceship with arrows and fires with space, if all
+spaceships are taken the client only watches.
+"""
+import argparse
+import asyncio
+import curses
+import socket
+import sys
+
+from curses_tools import (DOWN_KEY_CODE, LEFT_KEY_CODE, RIGHT_KEY_CODE,
+                          SPACE_KEY_CODE, UP_KEY_CODE)
+from game_server import (DOWN_FLAG, HELLO, HELLO_FORMAT, INPUT_FORMAT,
+                         KEYFRAME, LEFT_FLAG, LENGTH_FORMAT, PILOT_ROLE,
+                         RIGHT_FLAG, SPACE_FLAG, SPECTATOR_ROLE, UP_FLAG,
+                         decode_packet, decode_runs)
+from terminal_output import CursesOutput
+
+KEYS_FLAGS = {
+    UP_KEY_CODE: UP_FLAG,
+    DOWN_KEY_CODE: DOWN_FLAG,
+    LEFT_KEY_CODE: LEFT_FLAG,
+    RIGHT_KEY_CODE: RIGHT_FLAG,
+    SPACE_KEY_CODE: SPACE_FLAG,
+}
+
+
+class ScreenClient:
+    """Connection to the server, keeps a copy of the streamed screen.
+
+    `read_frame` applies the next frame to `symbols` and `attrs`,
+    `send_input` acknowledges it and sends controls of a pilot.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.rows_number = self.columns_number = 0
+        self.ship_number = -1
+        self.tick = None
+        self.symbols = []
+        self.attrs = []
+        self.frames = 0
+        self.keyframes = 0
+        self.skipped_ticks = 0
+        self.received_bytes = 0
+
+    @classmethod
+    async def connect(cls, host, port, pilot=False, receive_buffer_size=None):
+        """Connect and read the hello of the server.
+
+        receive_buffer_size — size of the socket receive buffer, e.g. small
+        to make a slow client, the system default if None.
+        """
+
+        if receive_buffer_size is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        else:
+            loop = asyncio.get_running_loop()
+            sock = create_socket(receive_buffer_size)
+            sock.setblocking(False)
+            await loop.sock_connect(sock, (host, port))
+            reader, writer = await asyncio.open_connection(sock=sock)
+
+        writer.write(PILOT_ROLE if pilot else SPECTATOR_ROLE)
+        client = cls(reader, writer)
+        kind, _, body = await client._read_packet()
+        if kind != HELLO:
+            raise ConnectionError('The server has not sent a hello.')
+        client.rows_number, client.columns_number, client.ship_number = \
+            HELLO_FORMAT.unpack(body)
+        client.symbols = [
+            [' '] * client.columns_number for _ in range(client.rows_number)
+        ]
+        client.attrs = [
+            [0] * client.columns_number for _ in range(client.rows_number)
+        ]
+        return client
+
+    async def _read_packet(self):
+        length, = LENGTH_FORMAT.unpack(
+            await self.reader.readexactly(LENGTH_FORMAT.size)
+        )
+        data = await self.reader.readexactly(length)
+        self.received_bytes += LENGTH_FORMAT.size + length
+        return decode_packet(data)
+
+    async def read_frame(self):
+        """Read a frame, apply it to the screen and return
+        kind, tick and runs of the frame."""
+
+        kind, tick, body = await self._read_packet()
+        if kind == KEYFRAME:
+            self.keyframes += 1
+            for symbols, attrs in zip(self.symbols, self.attrs):
+                symbols[:] = ' ' * self.columns_number
+                attrs[:] = [0] * self.columns_number
+        if self.tick is not None:
+            self.skipped_ticks += tick - self.tick - 1
+        self.tick = tick
+        self.frames += 1
+
+        runs = list(decode_runs(body))
+        for row, column, text, attr in runs:
+            self.symbols[row][column:column + len(text)] = text
+            self.attrs[row][column:column + len(text)] = [attr] * len(text)
+        return kind, tick, runs
+
+    def send_input(self, flags=0):
+        self.writer.write(INPUT_FORMAT.pack(self.tick, flags))
+
+    def get_text(self):
+        return '\n'.join(''.join(symbols) for symbols in self.symbols)
+
+    def close(self):
+        self.writer.close()
+
+
+def create_socket(receive_buffer_size):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer_size)
+    return sock
+
+
+async def watch(canvas, host, port, pilot):
+    client = await ScreenClient.connect(host, port, pilot)
+    output = CursesOutput(canvas)
+    rows_number, columns_number = canvas.getmaxyx()
+    flags = 0
+
+    def read_keys():
+        nonlocal flags
+        while True:
+            key_code = canvas.getch()
+            if key_code == -1:
+                break
+            flags |= KEYS_FLAGS.get(key_code, 0)
+
+    loop = asyncio.get_running_loop()
+    loop.add_reader(sys.stdin.fileno(), read_keys)
+    try:
+        while True:
+            kind, _, runs = await client.read_frame()
+            if kind == KEYFRAME:
+                canvas.erase()
+            for row, column, text, attr in runs:
+                # the terminal may be smaller than the screen of the server
+                text = text[:max(columns_number - column, 0)]
+                if row < rows_number and text:
+                    output.write(row, column, text, attr)
+            output.present()
+            client.send_input(flags)
+            flags = 0
+    except asyncio.IncompleteReadError:
+        pass
+    finally:
+        loop.remove_reader(sys.stdin.fileno())
+        client.close()
+
+
+def run_watch(canvas, host, port, pilot):
+    try:
+        curses.curs_set(False)
+    except curses.error:
+        pass
+    canvas.nodelay(True)
+    asyncio.run(watch(canvas, host, port, pilot))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Watch or pilot a game streamed by game_server.py'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument(
+        '--pilot',
+        action='store_true',
+        help='take a free spaceship, arrows steer and space fires',
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    curses.wrapper(run_watch, args.host, args.port, args.pilot)
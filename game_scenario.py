@@ -1,27 +1,130 @@
-PHRASES = {
-    1957: "First Sputnik",
-    1961: "Gagarin flew!",
-    1969: "Armstrong got on the moon!",
-    1971: "First orbital space station Salute-1",
-    1981: "Flight of the Shuttle Columbia",
-    1998: 'ISS start building',
-    2011: 'Messenger launch to Mercury',
-    2020: "Take the plasma gun! Shoot the garbage!",
-}
-
-
-def get_garbage_delay_tics(year):
-    if year < 1961:
-        return None
-    elif year < 1969:
-        return 20
-    elif year < 1981:
-        return 14
-    elif year < 1995:
-        return 10
-    elif year < 2010:
-        return 8
-    elif year < 2020:
-        return 6
-    else:
-        return 2
+"""Scenarios of the game described by data files in `scenarios`.
+
+A scenario file is JSON:
+- `eras` — list sorted by `from_year`, every era sets `garbage_delay_tics`
+  (null — no garbage), `garbage_per_launch` — pieces of garbage launched
+  at once, 1 by default, e.g. to stress the game past one piece per tick,
+  and `frames` — names of frame groups of garbage, a missing field is
+  taken from the previous era;
+- `phrases` — dict: year — event shown in the title until the next one;
+- `gun_year` — year since the spaceship can fire.
+
+On load a scenario is compiled into a table of settings by years, so
+the game gets settings of a year with one list index.
+"""
+import collections
+import json
+import os
+import zlib
+
+SCENARIOS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'scenarios'
+)
+DEFAULT_SCENARIO_PATH = os.path.join(SCENARIOS_DIR, 'classic.json')
+
+YearSettings = collections.namedtuple(
+    'YearSettings',
+    [
+        'year',
+        'garbage_delay_tics',
+        'garbage_per_launch',
+        'frames_groups',
+        'phrase',
+        'gun_available',
+    ],
+)
+
+
+class Scenario:
+
+    def __init__(self, eras, phrases, gun_year):
+        """eras — list of dicts sorted by `from_year`,
+        phrases — dict: int year — phrase."""
+
+        if not eras:
+            raise ValueError('Scenario should have at least one era.')
+
+        from_years = [era['from_year'] for era in eras]
+        if from_years != sorted(from_years):
+            raise ValueError('Eras of the scenario should be sorted by year.')
+
+        self.first_year = eras[0]['from_year']
+        self.last_year = max([*from_years, *phrases, gun_year])
+        eras_by_years = {era['from_year']: era for era in eras}
+
+        self._years_settings = []
+        garbage_delay_tics = None
+        garbage_per_launch = 1
+        frames_groups = ()
+        phrase = ''
+        for year in range(self.first_year, self.last_year + 1):
+            era = eras_by_years.get(year, {})
+            garbage_delay_tics = era.get(
+                'garbage_delay_tics', garbage_delay_tics
+            )
+            garbage_per_launch = era.get(
+                'garbage_per_launch', garbage_per_launch
+            )
+            frames_groups = tuple(era.get('frames', frames_groups))
+            phrase = phrases.get(year, phrase)
+            self._years_settings.append(YearSettings(
+                year,
+                garbage_delay_tics,
+                garbage_per_launch,
+                frames_groups,
+                phrase,
+                year >= gun_year,
+            ))
+
+    def get_year_settings(self, year):
+        """Return settings of a year, years out of the scenario have
+        settings of the nearest described year."""
+
+        nearest_year = min(max(year, self.first_year), self.last_year)
+        settings = self._years_settings[nearest_year - self.first_year]
+        if nearest_year != year:
+            settings = settings._replace(year=year)
+        return settings
+
+
+def load_scenario(scenario_path=DEFAULT_SCENARIO_PATH):
+    with open(scenario_path, 'r') as scenario_file:
+        scenario_data = json.load(scenario_file)
+
+    return Scenario(
+        scenario_data['eras'],
+        {
+            int(year): phrase
+            for year, phrase in scenario_data.get('phrases', {}).items()
+        },
+        scenario_data['gun_year'],
+    )
+
+
+def get_scenario_checksum(scenario_path):
+    with open(scenario_path, 'rb') as scenario_file:
+        return zlib.crc32(scenario_file.read())
+
+
+def encode_scenario_path(scenario_path):
+    """Return the path to save, e.g. in a session log: relative to
+    `scenarios` for scenarios there, absolute otherwise."""
+
+    scenario_path = os.path.abspath(scenario_path)
+    if os.path.dirname(scenario_path) == SCENARIOS_DIR:
+        return os.path.basename(scenario_path)
+    return scenario_path
+
+
+def decode_scenario_path(encoded_path):
+    return os.path.join(SCENARIOS_DIR, encoded_path)
+
+
+def has_scenario_changed(scenario_path, scenario_checksum):
+    """Check if the scenario file is missing or differs from the saved
+    one of the checksum."""
+
+    return (
+        not os.path.exists(scenario_path)
+        or get_scenario_checksum(scenario_path) != scenario_checksum
+    )
@@ -0,0 +1,456 @@
+"""Stream the game to spectators and pilots over TCP.
+
+Usage:
+    python game_server.py --port 8765 --ships 2 --size 200x60
+    python game_client.py --port 8765 --pilot
+
+The game runs headless once, the server is an output backend of its
+screen: cells changed in a tick are encoded once, compressed and sent to
+every client. A client whose socket is not drained drops frames instead
+of stalling the tick, it gets a keyframe of the whole screen when it has
+caught up.
+
+Protocol, all numbers are big-endian:
+- a client sends a role byte first, `P` — pilot, `S` — spectator;
+- the server sends packets: length (uint32) and zlib-compressed body.
+  A body starts with the kind byte and tick (uint32):
+  `H` hello — rows, columns (uint16) and the spaceship (int16, -1 for
+  a spectator), `K` keyframe — runs of a blank screen, `D` delta — runs
+  changed since the previous tick. A run is row, column (uint16),
+  attr (uint32), length (uint16) and UTF-8 text;
+- after every frame the client sends an input packet: tick of the frame
+  (uint32) and controls flags (byte), see `CONTROLS_FLAGS`.
+"""
+import argparse
+import asyncio
+import collections
+import socket
+import struct
+import time
+import zlib
+
+import game
+from game_scenario import DEFAULT_SCENARIO_PATH
+from headless import FakeCanvas, parse_size
+
+HELLO, KEYFRAME, DELTA = b'H', b'K', b'D'
+PILOT_ROLE, SPECTATOR_ROLE = b'P', b'S'
+
+LENGTH_FORMAT = struct.Struct('!I')
+HEADER_FORMAT = struct.Struct('!cI')
+HELLO_FORMAT = struct.Struct('!HHh')
+RUN_FORMAT = struct.Struct('!HHIH')
+INPUT_FORMAT = struct.Struct('!IB')
+
+UP_FLAG, DOWN_FLAG, LEFT_FLAG, RIGHT_FLAG, SPACE_FLAG = 1, 2, 4, 8, 16
+CONTROLS_FLAGS = (UP_FLAG, DOWN_FLAG, LEFT_FLAG, RIGHT_FLAG, SPACE_FLAG)
+
+# ticks to keep send times of, to measure lag of acknowledged frames
+SENT_TICKS_HISTORY = 256
+
+
+def encode_packet(kind, tick, body=b''):
+    data = zlib.compress(HEADER_FORMAT.pack(kind, tick) + body, 1)
+    return LENGTH_FORMAT.pack(len(data)) + data
+
+
+def decode_packet(data):
+    """Return kind, tick and body of a compressed packet body."""
+
+    data = zlib.decompress(data)
+    kind, tick = HEADER_FORMAT.unpack_from(data)
+    return kind, tick, data[HEADER_FORMAT.size:]
+
+
+def encode_run(row, column, text, attr):
+    text = text.encode()
+    return RUN_FORMAT.pack(row, column, attr, len(text)) + text
+
+
+def decode_runs(body):
+    """Yield row, column, text and attr of runs of a frame body."""
+
+    offset = 0
+    while offset < len(body):
+        row, column, attr, length = RUN_FORMAT.unpack_from(body, offset)
+        offset += RUN_FORMAT.size
+        yield row, column, body[offset:offset + length].decode(), attr
+        offset += length
+
+
+def get_controls(flags):
+    """Return controls of input flags as `read_controls` does."""
+
+    rows_direction = columns_direction = 0
+    if flags & UP_FLAG:
+        rows_direction = -1
+    if flags & DOWN_FLAG:
+        rows_direction = 1
+    if flags & RIGHT_FLAG:
+        columns_direction = 1
+    if flags & LEFT_FLAG:
+        columns_direction = -1
+    return rows_direction, columns_direction, bool(flags & SPACE_FLAG)
+
+
+class ShipControls:
+    """Replacement of `read_controls` for a spaceship of a network pilot.
+
+    Flags of inputs received since the previous tick are merged, so
+    a fire pressed between tics is not lost.
+    """
+
+    def __init__(self):
+        self.client = None
+        self._flags = 0
+
+    def push(self, flags):
+        self._flags |= flags
+
+    def __call__(self, canvas):
+        flags, self._flags = self._flags, 0
+        return get_controls(flags)
+
+
+class Client:
+    """Connection of a spectator or a pilot and its traffic stats."""
+
+    def __init__(self, writer, ship_number):
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+        self.ship_number = ship_number
+        self.needs_keyframe = True
+        self.connected_at = time.perf_counter()
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.keyframes = 0
+        self.sent_bytes = 0
+        self.acked_tick = None
+        self.lags = collections.deque(maxlen=SENT_TICKS_HISTORY)
+
+    def send(self, packet):
+        self.writer.write(packet)
+        self.sent_bytes += len(packet)
+
+    def get_stats(self, tick):
+        duration = max(time.perf_counter() - self.connected_at, 1e-9)
+        lag_ticks = None
+        if self.acked_tick is not None:
+            lag_ticks = tick - self.acked_tick
+        return {
+            'address': f'{self.address[0]}:{self.address[1]}',
+            'ship': self.ship_number,
+            'sent_frames': self.sent_frames,
+            'dropped_frames': self.dropped_frames,
+            'keyframes': self.keyframes,
+            'sent_bytes': self.sent_bytes,
+            'bandwidth': self.sent_bytes / duration,
+            'lag_ticks': lag_ticks,
+            'lag_ms': (
+                sum(self.lags) / len(self.lags) * 1000 if self.lags else None
+            ),
+        }
+
+
+class GameServer:
+    """TCP server streaming the screen, an output backend of `Compositor`.
+
+    `write` collects runs of a tick, `present` sends them to clients.
+    ships_number — spaceships of pilots, `controls_readers` are passed
+    to `game.draw`. A spaceship without a pilot drifts.
+    max_buffer_size — bytes queued to a client above which its frames
+    are dropped.
+    send_buffer_size — size of the socket send buffers, the system
+    default if None.
+    """
+
+    def __init__(
+        self,
+        rows_number,
+        columns_number,
+        ships_number=0,
+        max_buffer_size=64 * 1024,
+        send_buffer_size=None
+    ):
+        self.rows_number = rows_number
+        self.columns_number = columns_number
+        self.controls_readers = [ShipControls() for _ in range(ships_number)]
+        self.max_buffer_size = max_buffer_size
+        self.send_buffer_size = send_buffer_size
+        self.tick = 0
+        self.address = None
+        self.clients = []
+        self.disconnected_clients_stats = []
+        self._symbols = [
+            [' '] * columns_number for _ in range(rows_number)
+        ]
+        self._attrs = [[0] * columns_number for _ in range(rows_number)]
+        self._runs = []
+        self._sent_at = {}
+        self._server = None
+
+    def write(self, row, column, text, attr):
+        self._symbols[row][column:column + len(text)] = text
+        self._attrs[row][column:column + len(text)] = [attr] * len(text)
+        self._runs.append(encode_run(row, column, text, attr))
+
+    def present(self):
+        self.tick += 1
+        delta = encode_packet(DELTA, self.tick, b''.join(self._runs))
+        self._runs.clear()
+        keyframe = None
+        for client in self.clients:
+            transport = client.writer.transport
+            if transport.get_write_buffer_size() > self.max_buffer_size:
+                client.dropped_frames += 1
+                client.needs_keyframe = True
+                continue
+            if client.needs_keyframe:
+                if keyframe is None:
+                    keyframe = self._encode_keyframe()
+                client.send(keyframe)
+                client.keyframes += 1
+                client.needs_keyframe = False
+            else:
+                client.send(delta)
+            client.sent_frames += 1
+
+        self._sent_at[self.tick] = time.perf_counter()
+        self._sent_at.pop(self.tick - SENT_TICKS_HISTORY, None)
+
+    def _encode_keyframe(self):
+        runs = []
+        for row, symbols in enumerate(self._symbols):
+            attrs = self._attrs[row]
+            column = 0
+            while column < self.columns_number:
+                if symbols[column] == ' ':
+                    column += 1
+                    continue
+                start_column = column
+                attr = attrs[column]
+                while (
+                    column < self.columns_number
+                    and symbols[column] != ' '
+                    and attrs[column] == attr
+                ):
+                    column += 1
+                runs.append(encode_run(
+                    row, start_column, ''.join(symbols[start_column:column]),
+                    attr,
+                ))
+        return encode_packet(KEYFRAME, self.tick, b''.join(runs))
+
+    def get_text(self):
+        """Return symbols of the screen sent to clients, a line per row."""
+
+        return '\n'.join(''.join(symbols) for symbols in self._symbols)
+
+    async def start(self, host='127.0.0.1', port=0):
+        self._server = await asyncio.start_server(
+            self._serve_client, host, port
+        )
+        self.address = self._server.sockets[0].getsockname()[:2]
+
+    async def serve(self, host='127.0.0.1', port=0):
+        """Accept clients until cancelled, a service of `game.draw`."""
+
+        await self.start(host, port)
+        try:
+            await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        self._server.close()
+        for client in self.clients:
+            client.writer.close()
+
+    def _get_free_ship(self):
+        for ship_number, controls in enumerate(self.controls_readers):
+            if controls.client is None:
+                return ship_number
+        return -1
+
+    async def _serve_client(self, reader, writer):
+        if self.send_buffer_size is not None:
+            writer.get_extra_info('socket').setsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size
+            )
+        try:
+            role = await reader.readexactly(1)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+
+        ship_number = self._get_free_ship() if role == PILOT_ROLE else -1
+        client = Client(writer, ship_number)
+        controls = None
+        if ship_number >= 0:
+            controls = self.controls_readers[ship_number]
+            controls.client = client
+        client.send(encode_packet(HELLO, self.tick, HELLO_FORMAT.pack(
+            self.rows_number, self.columns_number, ship_number
+        )))
+        self.clients.append(client)
+        try:
+            while True:
+                data = await reader.readexactly(INPUT_FORMAT.size)
+                tick, flags = INPUT_FORMAT.unpack(data)
+                sent_at = self._sent_at.get(tick)
+                if sent_at is not None:
+                    client.lags.append(time.perf_counter() - sent_at)
+                client.acked_tick = tick
+                if controls is not None:
+                    controls.push(flags)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.remove(client)
+            self.disconnected_clients_stats.append(client.get_stats(self.tick))
+            if controls is not None:
+                controls.client = None
+            writer.close()
+
+    def get_stats(self):
+        """Return stats of connected and disconnected clients."""
+
+        return [
+            *self.disconnected_clients_stats,
+            *[client.get_stats(self.tick) for client in self.clients],
+        ]
+
+
+def format_stats(clients_stats):
+    lines = [
+        f'{"client":<22}{"ship":>5}{"frames":>8}{"dropped":>8}'
+        f'{"keys":>6}{"KiB/s":>9}{"lag ticks":>10}{"lag ms":>8}'
+    ]
+    for stats in clients_stats:
+        lag_ticks = stats['lag_ticks']
+        lag_ms = stats['lag_ms']
+        lines.append(
+            f'{stats["address"]:<22}{stats["ship"]:>5}'
+            f'{stats["sent_frames"]:>8}{stats["dropped_frames"]:>8}'
+            f'{stats["keyframes"]:>6}{stats["bandwidth"] / 1024:>9.1f}'
+            f'{"-" if lag_ticks is None else lag_ticks:>10}'
+            f'{"-" if lag_ms is None else f"{lag_ms:.1f}":>8}'
+        )
+    return '\n'.join(lines)
+
+
+async def print_stats(server, interval):
+    while True:
+        await asyncio.sleep(interval)
+        print(f'tick {server.tick}, year {game.world.year}', flush=True)
+        print(format_stats(server.get_stats()), flush=True)
+
+
+def run_server(
+    server,
+    host='127.0.0.1',
+    port=8765,
+    seed=None,
+    tick_rate=10,
+    start_year=1957,
+    end_year=None,
+    tics_limit=None,
+    scenario_path=DEFAULT_SCENARIO_PATH,
+    stats_interval=None,
+    on_tick=None,
+    services=()
+):
+    """Run the game once and stream it to clients of the server,
+    return the game outcome.
+
+    services — more coroutines running along with the game,
+    e.g. loopback clients.
+    """
+
+    services = [server.serve(host, port), *services]
+    if stats_interval:
+        services.append(print_stats(server, stats_interval))
+    return game.draw(
+        FakeCanvas(server.rows_number, server.columns_number),
+        seed=seed,
+        tick_rate=tick_rate,
+        start_year=start_year,
+        end_year=end_year,
+        tics_limit=tics_limit,
+        on_tick=on_tick,
+        use_asyncio=True,
+        scenario_path=scenario_path,
+        controls_readers=server.controls_readers,
+        output=server,
+        services=services,
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Stream the space game to spectators and pilots'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument(
+        '--size',
+        type=parse_size,
+        default=(24, 80),
+        help='screen size COLUMNSxROWS, 80x24 by default',
+    )
+    parser.add_argument(
+        '--ships',
+        type=int,
+        default=1,
+        help='spaceships of pilots, 1 by default',
+    )
+    parser.add_argument('--seed', type=int, help='seed of random numbers')
+    parser.add_argument('--tick-rate', type=float, default=10)
+    parser.add_argument('--start-year', type=int, default=1957)
+    parser.add_argument('--end-year', type=int)
+    parser.add_argument(
+        '--scenario',
+        default=DEFAULT_SCENARIO_PATH,
+        metavar='FILE',
+        help='JSON file of the scenario',
+    )
+    parser.add_argument(
+        '--stats-interval',
+        type=float,
+        default=5,
+        metavar='SECONDS',
+        help='print stats of clients every SECONDS, 5 by default',
+    )
+    parser.add_argument(
+        '--max-buffer',
+        type=int,
+        default=64 * 1024,
+        metavar='BYTES',
+        help='drop frames of a client with more BYTES queued',
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rows_number, columns_number = args.size
+    server = GameServer(
+        rows_number, columns_number, args.ships, args.max_buffer
+    )
+    outcome = run_server(
+        server,
+        args.host,
+        args.port,
+        seed=args.seed,
+        tick_rate=args.tick_rate,
+        start_year=args.start_year,
+        end_year=args.end_year,
+        scenario_path=args.scenario,
+        stats_interval=args.stats_interval,
+    )
+    print(f'{outcome["tics"]} tics, year {outcome["year"]}')
+    print(format_stats(server.get_stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,379 @@
+"""Run the game without a terminal, e.g. for benchmarks and tests.
+
+Usage:
+    python headless.py --seed 1 --size 200x60 --end-year 2050
+    python headless.py --replay session.log
+    python headless.py --autopilot --scenario scenarios/stress.json
+    python headless.py --seed 1 --end-year 1990 --save-snapshot game.snap
+    python headless.py --snapshot game.snap --end-year 2000
+"""
+import argparse
+import functools
+import time
+
+import game
+from autopilot import Autopilot
+from curses_tools import (DOWN_KEY_CODE, LEFT_KEY_CODE, RIGHT_KEY_CODE,
+                          SPACE_KEY_CODE, UP_KEY_CODE, read_controls)
+from game_scenario import DEFAULT_SCENARIO_PATH
+from replay import SEEDS, Replay
+from world import load_snapshot
+
+KEY_CODES = {
+    'up': UP_KEY_CODE,
+    'down': DOWN_KEY_CODE,
+    'left': LEFT_KEY_CODE,
+    'right': RIGHT_KEY_CODE,
+    'space': SPACE_KEY_CODE,
+}
+
+
+class ScriptedInput:
+    """Keys pressed by tics. Every `read_controls` call reads keys of one tic.
+
+    tics_keys — iterable, every item is a list of key codes pressed during a
+    tic. Nothing is pressed when the script is over.
+    """
+
+    def __init__(self, tics_keys=()):
+        self._tics_keys = iter(tics_keys)
+        self._keys = None
+
+    def getch(self):
+        if self._keys is None:
+            self._keys = iter(next(self._tics_keys, ()))
+
+        key_code = next(self._keys, -1)
+        if key_code == -1:
+            self._keys = None
+        return key_code
+
+
+class FakeCanvas:
+    """In-memory replacement of a curses window.
+
+    Keeps symbols of cells and counts calls of drawing methods.
+    """
+
+    def __init__(self, rows_number=24, columns_number=80, scripted_input=None):
+        self._rows_number = rows_number
+        self._columns_number = columns_number
+        self.scripted_input = scripted_input or ScriptedInput()
+        self.rows = [
+            [' '] * columns_number
+            for _ in range(rows_number)
+        ]
+        self.calls = 0
+
+    def getmaxyx(self):
+        return self._rows_number, self._columns_number
+
+    def nodelay(self, flag):
+        pass
+
+    def clearok(self, flag):
+        pass
+
+    def resize(self, rows_number, columns_number):
+        """Crop or extend rows of cells as `window.resize` does."""
+
+        self.rows = [
+            (line + [' '] * columns_number)[:columns_number]
+            for line in self.rows[:rows_number]
+        ]
+        self.rows.extend(
+            [' '] * columns_number
+            for _ in range(rows_number - len(self.rows))
+        )
+        self._rows_number = rows_number
+        self._columns_number = columns_number
+
+    def getch(self):
+        return self.scripted_input.getch()
+
+    def refresh(self):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+    def derwin(self, *args):
+        if len(args) == 2:
+            begin_row, begin_column = args
+            rows_number = self._rows_number - begin_row
+            columns_number = self._columns_number - begin_column
+        else:
+            rows_number, columns_number, begin_row, begin_column = args
+        return _FakeSubWindow(
+            self, begin_row, begin_column, rows_number, columns_number
+        )
+
+    def addch(self, row, column, symbol, attr=0):
+        self.addstr(row, column, symbol, attr)
+
+    def addstr(self, row, column, text, attr=0):
+        self.calls += 1
+        line = self.rows[row]
+        for offset, symbol in enumerate(text):
+            line[column + offset] = symbol
+
+    def get_text(self):
+        return '\n'.join(''.join(line) for line in self.rows)
+
+
+class _FakeSubWindow(FakeCanvas):
+
+    def __init__(
+        self,
+        parent,
+        begin_row,
+        begin_column,
+        rows_number,
+        columns_number
+    ):
+        self._parent = parent
+        self._begin_row = begin_row
+        self._begin_column = begin_column
+        self._rows_number = rows_number
+        self._columns_number = columns_number
+
+    def getch(self):
+        return self._parent.getch()
+
+    def addstr(self, row, column, text, attr=0):
+        self._parent.addstr(
+            self._begin_row + row, self._begin_column + column, text, attr
+        )
+
+
+def run_headless(
+    rows_number=24,
+    columns_number=80,
+    seed=None,
+    tics_keys=(),
+    start_year=1957,
+    end_year=2050,
+    batch=False,
+    stress_shots=0,
+    tics_limit=None,
+    on_tick=None,
+    controls_reader=read_controls,
+    record_path=None,
+    stop_on_game_over=False,
+    scenario_path=DEFAULT_SCENARIO_PATH,
+    resizes=None,
+    snapshot=None,
+    keep_flying=False
+):
+    """Play the game as fast as possible, return the canvas
+    and the game outcome.
+
+    resizes — dict: tick — (rows_number, columns_number), the screen is
+    resized after the tick as if the terminal has been resized.
+    snapshot — bytes of `game.snapshot()` to resume the game from, the size
+    of the canvas is taken from the snapshot.
+    """
+
+    if snapshot is not None:
+        rows_number, columns_number = load_snapshot(snapshot).size
+    canvas = FakeCanvas(
+        rows_number, columns_number, ScriptedInput(tics_keys)
+    )
+    if resizes:
+        on_tick = functools.partial(resize_on_tick, resizes, on_tick)
+    outcome = game.draw(
+        canvas,
+        batch=batch,
+        stress_shots=stress_shots,
+        seed=seed,
+        tick_rate=None,
+        start_year=start_year,
+        end_year=end_year,
+        tics_limit=tics_limit,
+        on_tick=on_tick,
+        controls_reader=controls_reader,
+        record_path=record_path,
+        stop_on_game_over=stop_on_game_over,
+        scenario_path=scenario_path,
+        snapshot=snapshot,
+        keep_flying=keep_flying,
+    )
+    return canvas, outcome
+
+
+def resize_on_tick(resizes, on_tick=None):
+    size = resizes.get(game.scheduler.tick)
+    if size is not None:
+        game.viewport.request_resize(*size)
+    if on_tick is not None:
+        on_tick()
+
+
+def replay_headless(log_path):
+    """Replay a session log, return the replay and the game outcome."""
+
+    replay = Replay(log_path)
+    _, outcome = run_headless(
+        replay.rows_number,
+        replay.columns_number,
+        seed=replay.seed,
+        start_year=replay.start_year,
+        end_year=None,
+        tics_limit=replay.outcome['tics'],
+        controls_reader=replay.read_controls,
+        scenario_path=replay.scenario_path,
+        resizes=replay.resizes,
+    )
+    return replay, outcome
+
+
+def read_tics_keys(file_path):
+    """Read keys script, every line has keys of one tic, e.g. `up space`."""
+
+    with open(file_path, 'r') as script_file:
+        return [
+            [KEY_CODES[key_name] for key_name in line.split()]
+            for line in script_file
+        ]
+
+
+def parse_size(size):
+    columns_number, rows_number = size.lower().split('x')
+    return int(rows_number), int(columns_number)
+
+
+def parse_resize(resize):
+    """Parse `TICK:COLUMNSxROWS`, return tick and size."""
+
+    tick, size = resize.split(':')
+    return int(tick), parse_size(size)
+
+
+def read_snapshot(file_path):
+    with open(file_path, 'rb') as snapshot_file:
+        return snapshot_file.read()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Run the space game headless as fast as possible'
+    )
+    parser.add_argument('--seed', type=int, help='seed of random numbers')
+    parser.add_argument(
+        '--size',
+        type=parse_size,
+        default=(24, 80),
+        help='canvas size COLUMNSxROWS, 80x24 by default',
+    )
+    parser.add_argument('--start-year', type=int, default=1957)
+    parser.add_argument('--end-year', type=int, default=2050)
+    parser.add_argument(
+        '--keys',
+        type=read_tics_keys,
+        default=(),
+        help='file with keys pressed, one line per tic, e.g. `up space`',
+    )
+    parser.add_argument(
+        '--autopilot',
+        action='store_true',
+        help='the spaceship is piloted by the autopilot, keys are ignored',
+    )
+    parser.add_argument('--batch', action='store_true')
+    parser.add_argument('--stress', type=int, default=0, metavar='SHOTS')
+    parser.add_argument(
+        '--resize',
+        type=parse_resize,
+        action='append',
+        default=[],
+        metavar='TICK:COLUMNSxROWS',
+        help='resize the screen after TICK, e.g. `100:120x40`',
+    )
+    parser.add_argument(
+        '--show',
+        action='store_true',
+        help='print the last screen',
+    )
+    parser.add_argument(
+        '--scenario',
+        default=DEFAULT_SCENARIO_PATH,
+        metavar='FILE',
+        help='JSON file of the scenario',
+    )
+    parser.add_argument(
+        '--record',
+        metavar='FILE',
+        help='record the session log to FILE',
+    )
+    parser.add_argument(
+        '--replay',
+        metavar='FILE',
+        help='replay the session log and compare the game outcome',
+    )
+    parser.add_argument(
+        '--snapshot',
+        type=read_snapshot,
+        metavar='FILE',
+        help='resume the game from the snapshot, --size is ignored',
+    )
+    parser.add_argument(
+        '--save-snapshot',
+        metavar='FILE',
+        help='save the snapshot of the game to FILE when it stops',
+    )
+    args = parser.parse_args()
+    if args.record and args.seed is not None and args.seed not in SEEDS:
+        parser.error('--seed of a recorded session is a 64-bit integer')
+    if args.record and (args.batch or args.stress):
+        parser.error('--record is not combined with --batch or --stress')
+    return args
+
+
+def main():
+    args = parse_args()
+    rows_number, columns_number = args.size
+
+    if args.replay:
+        started_at = time.perf_counter()
+        replay, outcome = replay_headless(args.replay)
+        duration = time.perf_counter() - started_at
+        print(f'{outcome["tics"]} tics replayed in {duration:.2f} s')
+        differences = replay.get_differences(outcome)
+        for field, (recorded, replayed) in differences.items():
+            print(f'{field}: recorded {recorded}, replayed {replayed}')
+        if differences:
+            raise SystemExit('Replay outcome differs from the recorded one')
+        print('Replay outcome matches the recorded one')
+        return
+
+    started_at = time.perf_counter()
+    canvas, _ = run_headless(
+        rows_number,
+        columns_number,
+        seed=args.seed,
+        tics_keys=args.keys,
+        start_year=args.start_year,
+        end_year=args.end_year,
+        batch=args.batch,
+        stress_shots=args.stress,
+        controls_reader=Autopilot() if args.autopilot else read_controls,
+        record_path=args.record,
+        scenario_path=args.scenario,
+        resizes=dict(args.resize),
+        snapshot=args.snapshot,
+    )
+    duration = time.perf_counter() - started_at
+
+    if args.save_snapshot:
+        with open(args.save_snapshot, 'wb') as snapshot_file:
+            snapshot_file.write(game.snapshot())
+
+    if args.show:
+        print(canvas.get_text())
+    print(
+        f'{game.scheduler.tick} tics in {duration:.2f} s, '
+        f'year {game.world.year}'
+    )
+
+
+if __name__ == '__main__':
+    main()
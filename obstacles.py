@@ -4,12 +4,39 @@ from curses_tools import draw_frame
 
 class Obstacle:
 
+    __slots__ = (
+        'row',
+        'column',
+        'rows_size',
+        'columns_size',
+        'uid',
+        'hit',
+        'previous_row',
+        'previous_column',
+    )
+
     def __init__(self, row, column, rows_size=1, columns_size=1, uid=None):
+        self.reset(row, column, rows_size, columns_size, uid)
+
+    def reset(self, row, column, rows_size=1, columns_size=1, uid=None):
+        """Reinitialize the obstacle taken from a pool."""
+
         self.row = row
         self.column = column
         self.rows_size = rows_size
         self.columns_size = columns_size
         self.uid = uid
+        self.hit = False
+        self.previous_row = row
+        self.previous_column = column
+
+    def move(self, row, column):
+        """Change position, keep the previous one for swept collisions."""
+
+        self.previous_row = self.row
+        self.previous_column = self.column
+        self.row = row
+        self.column = column
 
     def get_bounding_box_frame(self):
         # increment box size to compensate obstacle movement
@@ -31,13 +58,85 @@ class Obstacle:
         obj_size_columns=1
     ):
         '''Determine if collision has occured. Return True or False.'''
-        return has_collision(
-            (self.row, self.column),
-            (self.rows_size, self.columns_size),
-            (obj_corner_row, obj_corner_column),
-            (obj_size_rows, obj_size_columns),
+        opposite_obj_row = obj_corner_row + obj_size_rows - 1
+        opposite_obj_column = obj_corner_column + obj_size_columns - 1
+        opposite_row = self.row + self.rows_size - 1
+        opposite_column = self.column + self.columns_size - 1
+
+        return (
+            _is_point_inside(
+                self.row, self.column, self.rows_size, self.columns_size,
+                obj_corner_row, obj_corner_column,
+            )
+            or _is_point_inside(
+                self.row, self.column, self.rows_size, self.columns_size,
+                opposite_obj_row, opposite_obj_column,
+            )
+            or _is_point_inside(
+                obj_corner_row, obj_corner_column,
+                obj_size_rows, obj_size_columns,
+                self.row, self.column,
+            )
+            or _is_point_inside(
+                obj_corner_row, obj_corner_column,
+                obj_size_rows, obj_size_columns,
+                opposite_row, opposite_column,
+            )
         )
 
+    def has_swept_collision(
+        self,
+        start_row,
+        start_column,
+        end_row,
+        end_column,
+        obj_size_rows=1,
+        obj_size_columns=1
+    ):
+        '''Determine if an object moving from start to end has collided
+        with the obstacle on its way, e.g. a fast shot which has jumped over
+        the obstacle. Movement of the obstacle since its previous position
+        is taken into account. Return True or False.'''
+
+        # the obstacle stays still, the object moves relative to it
+        start_row += self.row - self.previous_row
+        start_column += self.column - self.previous_column
+
+        # slab test of the segment against the obstacle box grown by the
+        # object size: find the part of the way inside by every axis.
+        # Columns go first: garbage and vertical shots keep their columns,
+        # so most candidates are rejected by one comparison, no division.
+        low = self.column - obj_size_columns
+        high = self.column + self.columns_size
+        delta = end_column - start_column
+        if not delta:
+            if not low < start_column < high:
+                return False
+            entering, leaving = 0, 1
+        else:
+            entering = (low - start_column) / delta
+            leaving = (high - start_column) / delta
+            if entering > leaving:
+                entering, leaving = leaving, entering
+            if entering < 0:
+                entering = 0
+            if leaving > 1:
+                leaving = 1
+            if entering >= leaving:
+                return False
+
+        low = self.row - obj_size_rows
+        high = self.row + self.rows_size
+        delta = end_row - start_row
+        if not delta:
+            return low < start_row < high
+
+        low_time = (low - start_row) / delta
+        high_time = (high - start_row) / delta
+        if low_time > high_time:
+            low_time, high_time = high_time, low_time
+        return max(entering, low_time) < min(leaving, high_time)
+
 
 def _get_bounding_box_lines(rows, columns):
 
@@ -48,7 +147,8 @@ def _get_bounding_box_lines(rows, columns):
 
 
 async def show_obstacles(canvas, obstacles):
-    """Display bounding boxes of every obstacle in a list"""
+    """Display bounding boxes of every obstacle in a collection,
+    e.g. `obstacles.values()`."""
 
     while True:
         boxes = []
@@ -83,21 +183,32 @@ def _is_point_inside(
 def has_collision(obstacle_corner, obstacle_size, obj_corner, obj_size=(1, 1)):
     '''Determine if collision has occured. Return True or False.'''
 
-    opposite_obstacle_corner = (
-        obstacle_corner[0] + obstacle_size[0] - 1,
-        obstacle_corner[1] + obstacle_size[1] - 1,
-    )
+    obstacle_row, obstacle_column = obstacle_corner
+    obstacle_rows, obstacle_columns = obstacle_size
+    obj_row, obj_column = obj_corner
+    obj_rows, obj_columns = obj_size
 
-    opposite_obj_corner = (
-        obj_corner[0] + obj_size[0] - 1,
-        obj_corner[1] + obj_size[1] - 1,
-    )
+    opposite_obj_row = obj_row + obj_rows - 1
+    opposite_obj_column = obj_column + obj_columns - 1
 
-    return any([
-        _is_point_inside(*obstacle_corner, *obstacle_size, *obj_corner),
-        _is_point_inside(*obstacle_corner, *obstacle_size,
-                         *opposite_obj_corner),
+    opposite_obstacle_row = obstacle_row + obstacle_rows - 1
+    opposite_obstacle_column = obstacle_column + obstacle_columns - 1
 
-        _is_point_inside(*obj_corner, *obj_size, *obstacle_corner),
-        _is_point_inside(*obj_corner, *obj_size, *opposite_obstacle_corner),
-    ])
+    return (
+        _is_point_inside(
+            obstacle_row, obstacle_column, obstacle_rows, obstacle_columns,
+            obj_row, obj_column,
+        )
+        or _is_point_inside(
+            obstacle_row, obstacle_column, obstacle_rows, obstacle_columns,
+            opposite_obj_row, opposite_obj_column,
+        )
+        or _is_point_inside(
+            obj_row, obj_column, obj_rows, obj_columns,
+            obstacle_row, obstacle_column,
+        )
+        or _is_point_inside(
+            obj_row, obj_column, obj_rows, obj_columns,
+            opposite_obstacle_row, opposite_obstacle_column,
+        )
+    )
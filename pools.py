@@ -0,0 +1,42 @@
+class Pool:
+    """Free list of objects reused instead of allocating new ones.
+
+    factory — class creating an object from arguments of `acquire`,
+    a reused object gets the same arguments by its `reset` method.
+    Released objects beyond max_size are left to the garbage collector.
+    """
+
+    def __init__(self, factory, max_size=1024):
+        self._factory = factory
+        self.max_size = max_size
+        self._free = []
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        """Return number of free objects."""
+
+        return len(self._free)
+
+    def acquire(self, *args):
+        if self._free:
+            self.hits += 1
+            item = self._free.pop()
+            item.reset(*args)
+            return item
+
+        self.misses += 1
+        return self._factory(*args)
+
+    def release(self, item):
+        """Return an object to the pool, it must not be used after that."""
+
+        if len(self._free) < self.max_size:
+            self._free.append(item)
+
+    def get_stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'free': len(self._free),
+        }
@@ -0,0 +1,167 @@
+"""Opt-in instrumentation of the game loop.
+
+TickProfiler keeps records of the last tics in a ring buffer: tick wall
+time, time spent by every coroutine type, curses calls, writes and bytes
+of an output bypassing curses, numbers of coroutines and obstacles, hits
+and misses of object pools. Records can be shown by `show_profile`
+overlay and dumped to a JSON lines file for offline analysis.
+"""
+import asyncio
+import collections
+import json
+import time
+
+from curses_tools import draw_frame
+
+COUNTED_METHODS = (
+    'addch',
+    'addstr',
+    'refresh',
+    'noutrefresh',
+    'getch',
+    'derwin',
+)
+
+
+class CountingWindow:
+    """Curses window wrapper counting calls of drawing methods."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.calls = 0
+
+    def __getattr__(self, name):
+        attribute = getattr(self.canvas, name)
+        if name not in COUNTED_METHODS:
+            return attribute
+
+        def count_call(*args, **kwargs):
+            self.calls += 1
+            return attribute(*args, **kwargs)
+
+        return count_call
+
+
+class TickProfiler:
+
+    def __init__(self, ticks_number=1000, timer=time.perf_counter):
+        self.records = collections.deque(maxlen=ticks_number)
+        self.coroutines_times = collections.defaultdict(float)
+        self.counting_window = None
+        self.output = None
+        self._timer = timer
+        self._tick_started_at = None
+        self._counted_calls = 0
+        self._counted_writes = self._counted_bytes = 0
+
+    def wrap_canvas(self, canvas):
+        """Return canvas wrapper counting curses calls."""
+
+        self.counting_window = CountingWindow(canvas)
+        return self.counting_window
+
+    def count_output(self, output):
+        """Count writes of an output sending the screen past curses,
+        e.g. `terminal_output.AnsiOutput`."""
+
+        self.output = output
+        self._counted_writes = output.writes
+        self._counted_bytes = output.written_bytes
+
+    def start_tick(self):
+        self._tick_started_at = self._timer()
+        self.coroutines_times.clear()
+
+    def add_coroutine_time(self, coroutine, duration):
+        """Add time of one coroutine step, coroutines are grouped by names
+        of their functions, e.g. `fly_garbage`."""
+
+        self.coroutines_times[coroutine.cr_code.co_name] += duration
+
+    def finish_tick(
+        self,
+        tick,
+        coroutines_number,
+        obstacles_number,
+        pools=None
+    ):
+        """pools — dict: name — `pools.Pool`, e.g. `{'obstacles': pool}`."""
+
+        curses_calls = 0
+        if self.counting_window is not None:
+            curses_calls = self.counting_window.calls - self._counted_calls
+            self._counted_calls = self.counting_window.calls
+        output_writes = output_bytes = 0
+        if self.output is not None:
+            output_writes = self.output.writes - self._counted_writes
+            output_bytes = self.output.written_bytes - self._counted_bytes
+            self._counted_writes = self.output.writes
+            self._counted_bytes = self.output.written_bytes
+
+        self.records.append({
+            'tick': tick,
+            'wall_time': self._timer() - self._tick_started_at,
+            'coroutines_times': dict(self.coroutines_times),
+            'curses_calls': curses_calls,
+            'output_writes': output_writes,
+            'output_bytes': output_bytes,
+            'coroutines': coroutines_number,
+            'obstacles': obstacles_number,
+            'pools': {
+                name: pool.get_stats()
+                for name, pool in (pools or {}).items()
+            },
+        })
+
+    def dump(self, file_path):
+        """Write records to a file, one JSON object per line."""
+
+        with open(file_path, 'w') as dump_file:
+            for record in self.records:
+                dump_file.write(json.dumps(record) + '\n')
+
+
+def _format_record(record):
+    lines = [
+        f'tick {record["tick"]}: {record["wall_time"] * 1000:.2f} ms',
+        f'curses calls {record["curses_calls"]}',
+        f'output writes {record["output_writes"]} '
+        f'{record["output_bytes"]} bytes',
+        f'coroutines {record["coroutines"]}',
+        f'obstacles {record["obstacles"]}',
+    ]
+    for name, stats in record.get('pools', {}).items():
+        lines.append(
+            f'{name} pool {stats["hits"]} hits {stats["misses"]} misses'
+        )
+    coroutines_times = sorted(
+        record['coroutines_times'].items(),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    for name, duration in coroutines_times:
+        lines.append(f'{name} {duration * 1000:.2f} ms')
+
+    width = max(len(line) for line in lines)
+    border = '+' + '-' * (width + 2) + '+'
+    return '\n'.join([
+        border,
+        *[f'| {line.ljust(width)} |' for line in lines],
+        border,
+    ])
+
+
+async def show_profile(canvas, profiler, row=1, column=1):
+    """Display a box with records of the last tick."""
+
+    while True:
+        if not profiler.records:
+            await asyncio.sleep(0)
+            continue
+
+        frame = _format_record(profiler.records[-1])
+        draw_frame(canvas, row, column, frame)
+
+        await asyncio.sleep(0)
+
+        draw_frame(canvas, row, column, frame, negative=True)
@@ -0,0 +1,124 @@
+from curses_tools import beep
+from pools import Pool
+
+FLASH, BURST, LAUNCH, FLYING = range(4)
+
+
+class Projectile:
+    """Gun shot state: position, speed and stage of the animation."""
+
+    __slots__ = ('row', 'column', 'rows_speed', 'columns_speed', 'stage')
+
+    def __init__(self, row, column, rows_speed=-0.3, columns_speed=0):
+        self.reset(row, column, rows_speed, columns_speed)
+
+    def reset(self, row, column, rows_speed=-0.3, columns_speed=0):
+        self.row = row
+        self.column = column
+        self.rows_speed = rows_speed
+        self.columns_speed = columns_speed
+        self.stage = FLASH
+
+
+class Projectiles:
+    """Gun shots moved and drawn together by one coroutine.
+
+    A shot is shown as a flash `*`, then `O`, then it flies until it hits
+    an obstacle or leaves the screen and goes back to the pool.
+    """
+
+    def __init__(self, pool_size=1024):
+        self.pool = Pool(Projectile, pool_size)
+        self._flying = []
+
+    def __len__(self):
+        return len(self._flying)
+
+    def launch(self, row, column, rows_speed=-0.3, columns_speed=0):
+        """Add a shot, it is drawn on the next update."""
+
+        self._flying.append(
+            self.pool.acquire(row, column, rows_speed, columns_speed)
+        )
+
+    def dump(self):
+        """Return states of flying shots as tuples, e.g. for a snapshot."""
+
+        return [
+            (
+                projectile.row,
+                projectile.column,
+                projectile.rows_speed,
+                projectile.columns_speed,
+                projectile.stage,
+            )
+            for projectile in self._flying
+        ]
+
+    def load(self, states):
+        """Add shots of `dump` states."""
+
+        for row, column, rows_speed, columns_speed, stage in states:
+            projectile = self.pool.acquire(
+                row, column, rows_speed, columns_speed
+            )
+            projectile.stage = stage
+            self._flying.append(projectile)
+
+    def update(self, canvas, obstacles_grid):
+        """Make one step of every shot, mark obstacles they hit."""
+
+        rows, columns = canvas.getmaxyx()
+        max_row, max_column = rows - 1, columns - 1
+
+        flying = []
+        for projectile in self._flying:
+            if _make_step(
+                canvas, projectile, obstacles_grid, max_row, max_column
+            ):
+                flying.append(projectile)
+            else:
+                self.pool.release(projectile)
+        self._flying = flying
+
+
+def _make_step(canvas, projectile, obstacles_grid, max_row, max_column):
+    """Return False when the shot is over."""
+
+    row, column = projectile.row, projectile.column
+    if projectile.stage == FLASH:
+        canvas.addstr(round(row), round(column), '*')
+        projectile.stage = BURST
+        return True
+
+    if projectile.stage == BURST:
+        canvas.addstr(round(row), round(column), 'O')
+        projectile.stage = LAUNCH
+        return True
+
+    canvas.addstr(round(row), round(column), ' ')
+    previous_row, previous_column = round(row), round(column)
+    row += projectile.rows_speed
+    column += projectile.columns_speed
+    projectile.row, projectile.column = row, column
+
+    if projectile.stage == LAUNCH:
+        projectile.stage = FLYING
+        beep()
+    else:
+        candidates = obstacles_grid.query_segment(
+            previous_row, previous_column, round(row), round(column)
+        )
+        for obstacle in candidates:
+            if obstacle.has_swept_collision(
+                previous_row, previous_column, round(row), round(column)
+            ):
+                obstacle.hit = True
+                return False
+
+    if not (0 < row < max_row and 0 < column < max_column):
+        return False
+
+    symbol = '-' if projectile.columns_speed else '|'
+    canvas.addstr(round(row), round(column), symbol)
+    return True
@@ -0,0 +1,222 @@
+"""Record and replay of game sessions.
+
+A log is a binary file:
+- header: magic, version, seed (a signed 64-bit integer), canvas rows
+  and columns, start year;
+- scenario: a checksum of the scenario file, the length of its path and
+  the path, relative to `scenarios` for scenarios there;
+- controls: runs of equal controls states, every run is a varint number
+  of `read_controls` calls followed by a state byte, 0 ends the runs;
+- resizes: a varint number of resizes of the screen, every resize is
+  the tick after which the size has been requested, rows and columns;
+- outcome: tics played, game over tick, shots fired, garbage destroyed
+  and a checksum of the last screen.
+"""
+import struct
+
+from curses_tools import read_controls
+from game_scenario import (
+    DEFAULT_SCENARIO_PATH,
+    decode_scenario_path,
+    encode_scenario_path,
+    get_scenario_checksum,
+    has_scenario_changed,
+)
+
+MAGIC = b'SGRP'
+# 2: screens are composed of layers, checksums of version 1 differ
+# 3: the scenario is recorded
+# 4: resizes of the screen are recorded
+VERSION = 4
+HEADER = struct.Struct('<4sBqHHH')
+# seeds which fit the header
+SEEDS = range(-2 ** 63, 2 ** 63)
+SCENARIO = struct.Struct('<IH')
+RESIZE = struct.Struct('<IHH')
+OUTCOME = struct.Struct('<IiIII')
+OUTCOME_FIELDS = (
+    'tics',
+    'game_over_tick',
+    'shots',
+    'destroyed',
+    'screen_checksum',
+)
+
+
+def encode_controls(rows_direction, columns_direction, space_pressed):
+    return (
+        (rows_direction + 1)
+        | (columns_direction + 1) << 2
+        | int(space_pressed) << 4
+    )
+
+
+def decode_controls(state):
+    rows_direction = (state & 0b11) - 1
+    columns_direction = (state >> 2 & 0b11) - 1
+    space_pressed = bool(state >> 4 & 1)
+    return rows_direction, columns_direction, space_pressed
+
+
+def _write_varint(log_file, number):
+    while number >= 0x80:
+        log_file.write(bytes([number & 0x7f | 0x80]))
+        number >>= 7
+    log_file.write(bytes([number]))
+
+
+def _read(log_file, size):
+    data = log_file.read(size)
+    if len(data) < size:
+        raise ValueError(f'{log_file.name} is truncated')
+    return data
+
+
+def _read_varint(log_file):
+    number = shift = 0
+    while True:
+        byte = _read(log_file, 1)[0]
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return number
+        shift += 7
+
+
+class ControlsRecorder:
+    """Replacement of `read_controls` writing controls states to a log."""
+
+    def __init__(
+        self,
+        log_path,
+        seed,
+        rows_number,
+        columns_number,
+        start_year,
+        read_controls=read_controls,
+        scenario_path=DEFAULT_SCENARIO_PATH
+    ):
+        self._read_controls = read_controls
+        self._log_file = open(log_path, 'wb')
+        self._log_file.write(HEADER.pack(
+            MAGIC, VERSION, seed, rows_number, columns_number, start_year
+        ))
+        encoded_path = encode_scenario_path(scenario_path).encode()
+        self._log_file.write(SCENARIO.pack(
+            get_scenario_checksum(scenario_path), len(encoded_path)
+        ))
+        self._log_file.write(encoded_path)
+        self._state = None
+        self._repeats = 0
+        self._resizes = []
+
+    def __call__(self, canvas):
+        controls = self._read_controls(canvas)
+        state = encode_controls(*controls)
+        if state == self._state:
+            self._repeats += 1
+        else:
+            self._write_run()
+            self._state = state
+            self._repeats = 1
+        return controls
+
+    def _write_run(self):
+        if self._repeats:
+            _write_varint(self._log_file, self._repeats)
+            self._log_file.write(bytes([self._state]))
+
+    def add_resize(self, tick, rows_number, columns_number):
+        """Record a resize of the screen requested after the tick."""
+
+        self._resizes.append((tick, rows_number, columns_number))
+
+    def close(self, outcome):
+        """Finish the log with the game outcome, see OUTCOME_FIELDS."""
+
+        self._write_run()
+        _write_varint(self._log_file, 0)
+        _write_varint(self._log_file, len(self._resizes))
+        for resize in self._resizes:
+            self._log_file.write(RESIZE.pack(*resize))
+        self._log_file.write(OUTCOME.pack(
+            *[outcome[field] for field in OUTCOME_FIELDS]
+        ))
+        self._log_file.close()
+
+
+class Replay:
+    """Session log, `read_controls` returns recorded controls states.
+
+    The scenario file should be the same as in the recorded session.
+    resizes — dict: tick — (rows_number, columns_number), the screen is
+    resized after the tick, see `headless.run_headless`.
+    """
+
+    def __init__(self, log_path):
+        with open(log_path, 'rb') as log_file:
+            magic, version, *header = HEADER.unpack(
+                _read(log_file, HEADER.size)
+            )
+            if magic != MAGIC:
+                raise ValueError(f'{log_path} is not a game session log')
+            if version != VERSION:
+                raise ValueError(
+                    f'{log_path} is a session log of version {version}, '
+                    f'version {VERSION} is supported'
+                )
+            (
+                self.seed,
+                self.rows_number,
+                self.columns_number,
+                self.start_year,
+            ) = header
+
+            scenario_checksum, path_length = SCENARIO.unpack(
+                _read(log_file, SCENARIO.size)
+            )
+            # a path relative to `scenarios` or an absolute one
+            self.scenario_path = decode_scenario_path(
+                _read(log_file, path_length).decode()
+            )
+            if has_scenario_changed(self.scenario_path, scenario_checksum):
+                raise ValueError(
+                    f'Scenario {self.scenario_path} of {log_path} is missing '
+                    'or has changed since the session was recorded'
+                )
+
+            self._runs = []
+            while True:
+                repeats = _read_varint(log_file)
+                if not repeats:
+                    break
+                state = _read(log_file, 1)[0]
+                self._runs.append((repeats, decode_controls(state)))
+
+            self.resizes = {}
+            for _ in range(_read_varint(log_file)):
+                tick, *size = RESIZE.unpack(_read(log_file, RESIZE.size))
+                self.resizes[tick] = tuple(size)
+
+            self.outcome = dict(zip(
+                OUTCOME_FIELDS,
+                OUTCOME.unpack(_read(log_file, OUTCOME.size)),
+            ))
+
+        self._controls = self._iterate_controls()
+
+    def _iterate_controls(self):
+        for repeats, controls in self._runs:
+            for _ in range(repeats):
+                yield controls
+
+    def read_controls(self, canvas):
+        return next(self._controls, (0, 0, False))
+
+    def get_differences(self, outcome):
+        """Return fields of outcome which differ from the recorded one."""
+
+        return {
+            field: (self.outcome[field], outcome[field])
+            for field in OUTCOME_FIELDS
+            if self.outcome[field] != outcome[field]
+        }
@@ -0,0 +1,96 @@
+import time
+
+
+class Sleep:
+    """Awaitable which parks a coroutine for a number of tics."""
+
+    __slots__ = ('tics',)
+
+    def __init__(self, tics):
+        self.tics = tics
+
+    def __await__(self):
+        yield self.tics
+
+
+async def sleep(tics=1):
+    if tics > 0:
+        await Sleep(tics)
+
+
+class Scheduler:
+    """Tick based scheduler for game coroutines.
+
+    Coroutines wait in a timing wheel — a dict of lists keyed by a tick
+    number. A tick resumes only coroutines due to this tick, in order
+    they were spawned.
+
+    Coroutine yields a number of tics to wait before the next resume.
+    `await asyncio.sleep(0)` yields None and means one tick.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self.resumes = 0
+        self._wheel = {}
+        self._coroutines_number = 0
+        self._spawned_number = 0
+        self.profiler = None
+
+    def __len__(self):
+        """Return number of live coroutines."""
+
+        return self._coroutines_number
+
+    def _park(self, entry, due_tick):
+        due_entries = self._wheel.get(due_tick)
+        if due_entries is None:
+            self._wheel[due_tick] = [entry]
+        else:
+            due_entries.append(entry)
+
+    def spawn(self, coroutine):
+        """Add coroutine, it will be resumed on the next tick."""
+
+        self._park((self._spawned_number, coroutine), self.tick)
+        self._spawned_number += 1
+        self._coroutines_number += 1
+
+    def close(self):
+        """Close all coroutines, e.g. when the game is over."""
+
+        for due_entries in self._wheel.values():
+            for _, coroutine in due_entries:
+                coroutine.close()
+        self._wheel.clear()
+        self._coroutines_number = 0
+
+    def run_tick(self):
+        """Resume coroutines due to the current tick."""
+
+        due_entries = self._wheel.pop(self.tick, [])
+        due_entries.sort(key=_get_spawn_number)
+        self.tick += 1
+        self.resumes = len(due_entries)
+
+        profiler = self.profiler
+        for entry in due_entries:
+            coroutine = entry[1]
+            if profiler is not None:
+                started_at = time.perf_counter()
+            try:
+                tics = coroutine.send(None)
+            except StopIteration:
+                self._coroutines_number -= 1
+                continue
+            finally:
+                if profiler is not None:
+                    profiler.add_coroutine_time(
+                        coroutine, time.perf_counter() - started_at
+                    )
+
+            self._park(entry, self.tick - 1 + (tics or 1))
+
+
+def _get_spawn_number(entry):
+    return entry[0]
@@ -0,0 +1,297 @@
+"""Play many seeded games headless in parallel with a scripted pilot,
+e.g. to tune garbage delays of a scenario and difficulty.
+
+Usage:
+    python simulate_games.py --games 1000 --sizes 80x24,200x60
+    python simulate_games.py --games 1000 --output results.jsonl
+    python simulate_games.py --games 1000 --scenario scenarios/hard.json
+    python simulate_games.py --games 100 --pilot autopilot --end-year 2200
+
+Games run in a pool of processes, one game per task. Results are written
+as soon as games finish, only running totals are kept for the summary.
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import sys
+import time
+
+from assets import load_frames
+from autopilot import Autopilot
+from game_scenario import DEFAULT_SCENARIO_PATH
+from headless import parse_size, run_headless
+
+
+class RandomPilot:
+    """Scripted pilot, replacement of `read_controls`.
+
+    Keeps a random direction for a few tics and fires with a given
+    probability. It has own random numbers so the game stays the same
+    for the same seed.
+    """
+
+    def __init__(self, seed, fire_probability=0.3, max_hold_tics=10):
+        self._random = random.Random(seed)
+        self._fire_probability = fire_probability
+        self._max_hold_tics = max_hold_tics
+        self._direction = 0, 0
+        self._hold_tics = 0
+
+    def __call__(self, canvas):
+        if not self._hold_tics:
+            self._direction = (
+                self._random.randint(-1, 1),
+                self._random.randint(-1, 1),
+            )
+            self._hold_tics = self._random.randint(1, self._max_hold_tics)
+        self._hold_tics -= 1
+        rows_direction, columns_direction = self._direction
+        space_pressed = self._random.random() < self._fire_probability
+        return rows_direction, columns_direction, space_pressed
+
+
+def play_game(
+    seed,
+    rows_number,
+    columns_number,
+    start_year,
+    end_year,
+    scenario_path=DEFAULT_SCENARIO_PATH,
+    pilot='random'
+):
+    """Play one game until the spaceship crashes or end_year comes,
+    return its result. Runs in a worker process.
+
+    pilot — `random` for RandomPilot or `autopilot` for the autopilot
+    dodging garbage.
+    """
+
+    ticks = {'started_at': time.perf_counter(), 'time': 0}
+
+    def on_tick():
+        now = time.perf_counter()
+        ticks['time'] += now - ticks['started_at']
+        ticks['started_at'] = now
+
+    _, outcome = run_headless(
+        rows_number,
+        columns_number,
+        seed=seed,
+        start_year=start_year,
+        end_year=end_year,
+        on_tick=on_tick,
+        controls_reader=(
+            Autopilot() if pilot == 'autopilot' else RandomPilot(seed)
+        ),
+        stop_on_game_over=True,
+        scenario_path=scenario_path,
+    )
+    return {
+        'seed': seed,
+        'size': f'{columns_number}x{rows_number}',
+        'start_year': start_year,
+        'survival_year': outcome['year'],
+        'crashed': outcome['game_over_tick'] >= 0,
+        'tics': outcome['tics'],
+        'shots': outcome['shots'],
+        'destroyed': outcome['destroyed'],
+        'mean_tick_ms': ticks['time'] / max(outcome['tics'], 1) * 1000,
+    }
+
+
+class Summary:
+    """Running totals of results grouped by canvas size and start year."""
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, result):
+        group = self.groups.setdefault(
+            (result['size'], result['start_year']),
+            {
+                'games': 0,
+                'crashed': 0,
+                'min_year': result['survival_year'],
+                'max_year': result['survival_year'],
+                'survival_year': 0,
+                'shots': 0,
+                'destroyed': 0,
+                'mean_tick_ms': 0,
+            },
+        )
+        group['games'] += 1
+        group['crashed'] += result['crashed']
+        group['min_year'] = min(group['min_year'], result['survival_year'])
+        group['max_year'] = max(group['max_year'], result['survival_year'])
+        for field in ('survival_year', 'shots', 'destroyed', 'mean_tick_ms'):
+            group[field] += result[field]
+
+    def print(self):
+        print(
+            f'{"size":>8} {"start":>5} {"games":>6} {"crashed":>8} '
+            f'{"mean year":>10} {"min":>5} {"max":>5} {"shots":>8} '
+            f'{"destroyed":>10} {"tick ms":>8}'
+        )
+        for (size, start_year), group in sorted(self.groups.items()):
+            games = group['games']
+            print(
+                f'{size:>8} {start_year:>5} {games:>6} '
+                f'{group["crashed"] / games:>8.0%} '
+                f'{group["survival_year"] / games:>10.1f} '
+                f'{group["min_year"]:>5} {group["max_year"]:>5} '
+                f'{group["shots"] / games:>8.1f} '
+                f'{group["destroyed"] / games:>10.1f} '
+                f'{group["mean_tick_ms"] / games:>8.3f}'
+            )
+
+
+def get_games(
+    games_number,
+    first_seed,
+    sizes,
+    start_years,
+    end_year,
+    scenario_path=DEFAULT_SCENARIO_PATH,
+    pilot='random'
+):
+    """Yield arguments of play_game, sizes and start years take turns."""
+
+    for number in range(games_number):
+        rows_number, columns_number = sizes[number % len(sizes)]
+        start_year = start_years[number // len(sizes) % len(start_years)]
+        yield (
+            first_seed + number,
+            rows_number,
+            columns_number,
+            start_year,
+            end_year,
+            scenario_path,
+            pilot,
+        )
+
+
+def simulate(games, on_result, workers_number=None):
+    """Play games in a pool of processes, call on_result with results
+    in order games finish.
+
+    Only a few games per worker are submitted at once, so arguments and
+    results of finished games are not kept in memory.
+    """
+
+    workers_number = workers_number or os.cpu_count()
+    games = iter(games)
+    with concurrent.futures.ProcessPoolExecutor(workers_number) as executor:
+        pending = set()
+        while True:
+            for game_arguments in games:
+                pending.add(executor.submit(play_game, *game_arguments))
+                if len(pending) >= workers_number * 2:
+                    break
+            if not pending:
+                break
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                on_result(future.result())
+
+
+def parse_sizes(sizes):
+    return [parse_size(size) for size in sizes.split(',')]
+
+
+def parse_years(years):
+    return [int(year) for year in years.split(',')]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Play many seeded games headless in parallel'
+    )
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument(
+        '--sizes',
+        type=parse_sizes,
+        default=[(24, 80), (60, 200)],
+        help='comma separated canvas sizes COLUMNSxROWS, 80x24,200x60 '
+        'by default',
+    )
+    parser.add_argument(
+        '--start-years',
+        type=parse_years,
+        default=[1957],
+        help='comma separated start years, 1957 by default',
+    )
+    parser.add_argument('--end-year', type=int, default=2050)
+    parser.add_argument(
+        '--scenario',
+        default=DEFAULT_SCENARIO_PATH,
+        metavar='FILE',
+        help='JSON file of the scenario, scenarios/classic.json by default',
+    )
+    parser.add_argument(
+        '--pilot',
+        choices=['random', 'autopilot'],
+        default='random',
+        help='random pilot or the autopilot dodging garbage, random by '
+        'default',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='number of processes, number of CPUs by default',
+    )
+    parser.add_argument(
+        '--output',
+        help='write results to a JSON lines file as games finish',
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # build the bundle of frames once, not in every worker at the same time
+    load_frames().close()
+
+    summary = Summary()
+    output_file = open(args.output, 'w') if args.output else None
+    started_at = time.perf_counter()
+    finished = 0
+
+    def on_result(result):
+        nonlocal finished
+        finished += 1
+        summary.add(result)
+        if output_file is not None:
+            output_file.write(json.dumps(result) + '\n')
+        print(f'\r{finished}/{args.games} games', end='', file=sys.stderr)
+
+    try:
+        simulate(
+            get_games(
+                args.games,
+                args.first_seed,
+                args.sizes,
+                args.start_years,
+                args.end_year,
+                args.scenario,
+                args.pilot,
+            ),
+            on_result,
+            args.workers,
+        )
+    finally:
+        if output_file is not None:
+            output_file.close()
+
+    duration = time.perf_counter() - started_at
+    print(f'\n{finished} games in {duration:.1f} s', file=sys.stderr)
+    summary.print()
+
+
+if __name__ == '__main__':
+    main()
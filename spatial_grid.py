@@ -0,0 +1,121 @@
+import math
+
+
+class SpatialGrid:
+    """Uniform grid of square cells, every cell keeps obstacles overlapping it.
+
+    Obstacles are registered with `add`, moved with `move` after their
+    row or column has changed and unregistered with `remove`.
+    `query` returns only obstacles whose cells overlap the requested box,
+    so the exact `has_collision` check runs for a few candidates instead of
+    the whole obstacles list.
+
+    An obstacle covers cells of its way since the previous position, so
+    `query_segment` finds candidates for `has_swept_collision` too.
+    """
+
+    def __init__(self, cell_size=8):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._ranges = {}
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def _get_cells_range(self, row, column, rows_size, columns_size):
+        cell_size = self.cell_size
+        return (
+            math.floor(row) // cell_size,
+            (math.ceil(row + rows_size) - 1) // cell_size,
+            math.floor(column) // cell_size,
+            (math.ceil(column + columns_size) - 1) // cell_size,
+        )
+
+    def _get_obstacle_cells_range(self, obstacle):
+        row, previous_row = obstacle.row, obstacle.previous_row
+        column, previous_column = obstacle.column, obstacle.previous_column
+        return self._get_cells_range(
+            min(row, previous_row),
+            min(column, previous_column),
+            obstacle.rows_size + abs(row - previous_row),
+            obstacle.columns_size + abs(column - previous_column),
+        )
+
+    def _link(self, obstacle, cells_range):
+        first_row, last_row, first_column, last_column = cells_range
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                cell = self._cells.setdefault((cell_row, cell_column), {})
+                cell[id(obstacle)] = obstacle
+
+    def _unlink(self, obstacle, cells_range):
+        first_row, last_row, first_column, last_column = cells_range
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                cell = self._cells[cell_row, cell_column]
+                del cell[id(obstacle)]
+                if not cell:
+                    del self._cells[cell_row, cell_column]
+
+    def add(self, obstacle):
+        cells_range = self._get_obstacle_cells_range(obstacle)
+        self._ranges[id(obstacle)] = cells_range
+        self._link(obstacle, cells_range)
+
+    def remove(self, obstacle):
+        cells_range = self._ranges.pop(id(obstacle))
+        self._unlink(obstacle, cells_range)
+
+    def move(self, obstacle):
+        """Update obstacle cells after its position has changed."""
+
+        cells_range = self._get_obstacle_cells_range(obstacle)
+        old_cells_range = self._ranges[id(obstacle)]
+        if cells_range == old_cells_range:
+            return
+
+        self._unlink(obstacle, old_cells_range)
+        self._ranges[id(obstacle)] = cells_range
+        self._link(obstacle, cells_range)
+
+    def query(self, row, column, rows_size=1, columns_size=1):
+        """Return obstacles which may overlap the box, without duplicates."""
+
+        first_row, last_row, first_column, last_column = (
+            self._get_cells_range(row, column, rows_size, columns_size)
+        )
+
+        if first_row == last_row and first_column == last_column:
+            cell = self._cells.get((first_row, first_column))
+            return list(cell.values()) if cell else []
+
+        candidates = {}
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                cell = self._cells.get((cell_row, cell_column))
+                if cell:
+                    candidates.update(cell)
+
+        return list(candidates.values())
+
+    def query_segment(
+        self,
+        start_row,
+        start_column,
+        end_row,
+        end_column,
+        rows_size=1,
+        columns_size=1
+    ):
+        """Return obstacles which may collide with a box moving
+        from start to end."""
+
+        if start_row == end_row and start_column == end_column:
+            # the box stands still, e.g. a slow shot in the same cell
+            return self.query(start_row, start_column, rows_size, columns_size)
+        return self.query(
+            min(start_row, end_row),
+            min(start_column, end_column),
+            rows_size + abs(end_row - start_row),
+            columns_size + abs(end_column - start_column),
+        )
@@ -0,0 +1,46 @@
+class Sprite:
+    """Multiline text fragment parsed once for drawing.
+
+    runs — list of (row, column, text) tuples, every text is a contiguous
+    part of a line without spaces. Spaces are transparent, they are never
+    drawn and never erased.
+    """
+
+    __slots__ = ('text', 'rows', 'rows_size', 'columns_size', 'runs')
+
+    def __init__(self, text):
+        self.text = text
+        self.rows = text.splitlines()
+        self.rows_size = len(self.rows)
+        self.columns_size = max([len(line) for line in self.rows], default=0)
+        self.runs = list(_get_runs(self.rows))
+
+    @classmethod
+    def from_geometry(cls, text, rows, rows_size, columns_size, runs):
+        """Create a sprite from geometry parsed before, e.g. in a bundle."""
+
+        sprite = cls.__new__(cls)
+        sprite.text = text
+        sprite.rows = rows
+        sprite.rows_size = rows_size
+        sprite.columns_size = columns_size
+        sprite.runs = runs
+        return sprite
+
+    def __repr__(self):
+        return f'Sprite({self.text!r})'
+
+
+def _get_runs(rows):
+    for row, line in enumerate(rows):
+        run_start = None
+        for column, symbol in enumerate(line):
+            if symbol == ' ':
+                if run_start is not None:
+                    yield row, run_start, line[run_start:column]
+                    run_start = None
+            elif run_start is None:
+                run_start = column
+
+        if run_start is not None:
+            yield row, run_start, line[run_start:]
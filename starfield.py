@@ -0,0 +1,133 @@
+import curses
+from array import array
+
+NORMAL_TICS = 3
+BOLD_TICS = 5
+
+
+class Starfield:
+    """Blinking stars kept in compact arrays.
+
+    Every star blinks: dim for offset tics, normal for 3 tics, bold for
+    5 tics, normal for 3 tics. A star is only redrawn on a tick its
+    brightness changes: stars wait in a timing wheel — a dict of lists of
+    star indexes keyed by a tick number.
+    """
+
+    def __init__(self):
+        self.rows = array('H')
+        self.columns = array('H')
+        self.symbols = bytearray()
+        self.offsets = bytearray()
+        self.phases = bytearray()
+        self.tick = 0
+        self._wheel = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add_star(self, row, column, symbol='*', offset_tics=20):
+        """Add a star, it is drawn on the next update."""
+
+        index = len(self.rows)
+        self.rows.append(row)
+        self.columns.append(column)
+        self.symbols.append(ord(symbol))
+        self.offsets.append(offset_tics)
+        # the first update switches a star to the first phase
+        self.phases.append(len(PHASES) - 1)
+        self._wheel.setdefault(self.tick, []).append(index)
+        return index
+
+    def dump(self):
+        """Return stars as plain lists, e.g. for a snapshot: rows,
+        columns, symbols, offsets, phases, the tick and due stars as
+        pairs (tick, star indexes)."""
+
+        return (
+            self.rows.tolist(),
+            self.columns.tolist(),
+            self.symbols.decode('ascii'),
+            list(self.offsets),
+            list(self.phases),
+            self.tick,
+            sorted(self._wheel.items()),
+        )
+
+    def load(self, state):
+        """Replace stars with ones of a `dump` state."""
+
+        rows, columns, symbols, offsets, phases, tick, wheel = state
+        self.rows = array('H', rows)
+        self.columns = array('H', columns)
+        self.symbols = bytearray(symbols.encode('ascii'))
+        self.offsets = bytearray(offsets)
+        self.phases = bytearray(phases)
+        self.tick = tick
+        self._wheel = {due_tick: list(stars) for due_tick, stars in wheel}
+
+    def crop(self, max_row, max_column):
+        """Remove stars below max_row or right of max_column,
+        e.g. when the screen shrinks."""
+
+        kept_stars = [
+            index
+            for index, (row, column) in enumerate(zip(self.rows, self.columns))
+            if row <= max_row and column <= max_column
+        ]
+        if len(kept_stars) == len(self.rows):
+            return
+
+        new_indexes = {
+            index: new_index for new_index, index in enumerate(kept_stars)
+        }
+        self.rows = array('H', [self.rows[index] for index in kept_stars])
+        self.columns = array(
+            'H', [self.columns[index] for index in kept_stars]
+        )
+        for name in ('symbols', 'offsets', 'phases'):
+            values = getattr(self, name)
+            setattr(
+                self, name, bytearray(values[index] for index in kept_stars)
+            )
+
+        wheel = {}
+        for tick, stars in self._wheel.items():
+            kept_due_stars = [
+                new_indexes[index] for index in stars if index in new_indexes
+            ]
+            if kept_due_stars:
+                wheel[tick] = kept_due_stars
+        self._wheel = wheel
+
+    def update(self, canvas):
+        """Redraw stars which change brightness on the current tick."""
+
+        changed_stars = self._wheel.pop(self.tick, [])
+        changed_stars.sort()
+        for index in changed_stars:
+            phase = (self.phases[index] + 1) % len(PHASES)
+            self.phases[index] = phase
+            attr, get_duration = PHASES[phase]
+            canvas.addstr(
+                self.rows[index],
+                self.columns[index],
+                chr(self.symbols[index]),
+                attr,
+            )
+            due_tick = self.tick + get_duration(self.offsets[index])
+            due_stars = self._wheel.get(due_tick)
+            if due_stars is None:
+                self._wheel[due_tick] = [index]
+            else:
+                due_stars.append(index)
+
+        self.tick += 1
+
+
+PHASES = [
+    (curses.A_DIM, lambda offset_tics: offset_tics),
+    (curses.A_NORMAL, lambda offset_tics: NORMAL_TICS),
+    (curses.A_BOLD, lambda offset_tics: BOLD_TICS),
+    (curses.A_NORMAL, lambda offset_tics: NORMAL_TICS),
+]
@@ -0,0 +1,116 @@
+"""Backends sending cells changed by `Compositor.flush` to the terminal.
+
+A backend gets runs of text with `write` and shows all of them at once
+with `present`, once per tick.
+"""
+import curses
+import os
+import sys
+
+# SGR parameters of curses attributes
+ATTRS_PARAMETERS = (
+    (curses.A_BOLD, '1'),
+    (curses.A_DIM, '2'),
+    (curses.A_UNDERLINE, '4'),
+    (curses.A_BLINK, '5'),
+    (curses.A_REVERSE, '7'),
+)
+
+
+class CursesOutput:
+    """Write runs to a curses window, update the terminal with
+    `noutrefresh` and one `doupdate`."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._rows_number, self._columns_number = canvas.getmaxyx()
+
+    def write(self, row, column, text, attr):
+        try:
+            self.canvas.addstr(row, column, text, attr)
+        except curses.error:
+            # Curses raises an exception after writing to the lower right
+            # corner of the window, the text is written anyway
+            # https://docs.python.org/3/library/curses.html#curses.window.addstr
+            if (
+                row != self._rows_number - 1
+                or column + len(text) != self._columns_number
+            ):
+                raise
+
+    def resize(self, rows_number, columns_number):
+        """Resize the window, e.g. after `curses.resizeterm`, and repaint
+        the whole terminal on the next present."""
+
+        self._rows_number, self._columns_number = rows_number, columns_number
+        self.canvas.resize(rows_number, columns_number)
+        self.canvas.clearok(True)
+
+    def present(self):
+        self.canvas.noutrefresh()
+        try:
+            curses.doupdate()
+        except curses.error:
+            # curses is not initialized, e.g. the game runs headless
+            pass
+
+
+class AnsiOutput:
+    """Build escape sequences of a tick in memory and send them to
+    the terminal with one `os.write`, bypassing the curses screen diff.
+
+    Curses still reads keys, so nothing should be drawn on its windows
+    after the output has been created. Over SSH it is one packet per tick
+    instead of several curses writes.
+    """
+
+    def __init__(self, file_descriptor=None):
+        if file_descriptor is None:
+            file_descriptor = sys.stdout.fileno()
+        self.file_descriptor = file_descriptor
+        self._buffer = bytearray()
+        self._cursor = None
+        self._attr = None
+        self.writes = 0
+        self.written_bytes = 0
+
+    def write(self, row, column, text, attr):
+        if self._cursor != (row, column):
+            self._buffer += f'\x1b[{row + 1};{column + 1}H'.encode()
+        if attr != self._attr:
+            self._buffer += get_sgr_sequence(attr).encode()
+            self._attr = attr
+        self._buffer += text.encode()
+        self._cursor = row, column + len(text)
+
+    def resize(self, rows_number, columns_number):
+        """Forget the cursor and attributes, the terminal may have
+        moved them while redrawing."""
+
+        self._cursor = None
+        self._attr = None
+
+    def present(self):
+        if not self._buffer:
+            return
+
+        data = memoryview(self._buffer)
+        while data:
+            written = os.write(self.file_descriptor, data)
+            data = data[written:]
+        self.writes += 1
+        self.written_bytes += len(self._buffer)
+        self._buffer = bytearray()
+        # the terminal cursor may wrap at the right edge, move it explicitly
+        self._cursor = None
+
+
+def get_sgr_sequence(attr):
+    """Return escape sequence resetting attributes and setting attr ones,
+    e.g. `ESC[0;1m` for `curses.A_BOLD`."""
+
+    parameters = ['0']
+    for curses_attr, parameter in ATTRS_PARAMETERS:
+        if attr & curses_attr:
+            parameters.append(parameter)
+    return f'\x1b[{";".join(parameters)}m'
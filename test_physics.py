@@ -0,0 +1,114 @@
+import itertools
+
+import pytest
+
+import physics
+from physics import ShipPhysics, update_speed
+
+# the acceleration curve of ShipPhysics is quantized by a table
+TOLERANCE = 1e-3
+SPEED_LIMITS = (0.5, 1, 2, 4)
+FADINGS = (0, 0.5, 0.8, 1)
+DIRECTIONS = (-1, 0, 1)
+LIMITS_AND_FADINGS = list(itertools.product(SPEED_LIMITS, FADINGS))
+
+
+def get_speeds(speed_limit, steps_number=40):
+    """Return speeds from -speed_limit to speed_limit."""
+
+    return [
+        speed_limit * step / steps_number
+        for step in range(-steps_number, steps_number + 1)
+    ]
+
+
+def get_cases(speed_limit):
+    """Return (row speed, column speed, rows direction, columns direction)
+    of every combination of speeds and directions."""
+
+    speeds = get_speeds(speed_limit)
+    return [
+        (row_speed, -row_speed, rows_direction, columns_direction)
+        for row_speed in speeds
+        for rows_direction, columns_direction in itertools.product(
+            DIRECTIONS, DIRECTIONS
+        )
+    ]
+
+
+@pytest.mark.parametrize('speed_limit, fading', LIMITS_AND_FADINGS)
+def test_update_speed_matches_function(speed_limit, fading):
+    ship_physics = ShipPhysics(speed_limit, speed_limit, fading)
+    for case in get_cases(speed_limit):
+        expected = update_speed(*case, speed_limit, speed_limit, fading)
+        assert ship_physics.update_speed(*case) == pytest.approx(
+            expected, abs=TOLERANCE
+        ), case
+
+
+@pytest.mark.parametrize('speed_limit', SPEED_LIMITS)
+def test_update_speed_clips_to_limit(speed_limit):
+    ship_physics = ShipPhysics(speed_limit, speed_limit, fading=1)
+    case = speed_limit, -speed_limit, 1, -1
+    expected = speed_limit, -speed_limit
+    assert update_speed(*case, speed_limit, speed_limit, 1) == expected
+    assert ship_physics.update_speed(*case) == expected
+    assert ship_physics.update_speeds(*zip(case)) == (
+        [speed_limit], [-speed_limit]
+    )
+
+
+def test_update_speed_stops_slow_ship():
+    ship_physics = ShipPhysics(2, 2)
+    # the brake leaves less than 0.1 of the speed
+    assert update_speed(-0.98, 0.98, 1, -1, 2, 2) == (0, 0)
+    assert ship_physics.update_speed(-0.98, 0.98, 1, -1) == (0, 0)
+    assert ship_physics.update_speeds([-0.98], [0.98], [1], [-1]) == (
+        [0], [0]
+    )
+
+
+def test_update_speed_keeps_speed_above_threshold():
+    ship_physics = ShipPhysics(2, 2)
+    row_speed, column_speed = update_speed(-1, 1, 1, -1, 2, 2)
+    assert abs(row_speed) >= 0.1
+    assert ship_physics.update_speed(-1, 1, 1, -1) == pytest.approx(
+        (row_speed, column_speed), abs=TOLERANCE
+    )
+
+
+def check_update_speeds(speed_limit, fading):
+    ship_physics = ShipPhysics(speed_limit, speed_limit, fading)
+    cases = get_cases(speed_limit)
+    rows_speeds, columns_speeds = ship_physics.update_speeds(*zip(*cases))
+
+    assert len(rows_speeds) == len(columns_speeds) == len(cases)
+    for case, row_speed, column_speed in zip(
+        cases, rows_speeds, columns_speeds
+    ):
+        expected = update_speed(*case, speed_limit, speed_limit, fading)
+        assert (row_speed, column_speed) == pytest.approx(
+            expected, abs=TOLERANCE
+        ), case
+        assert (row_speed, column_speed) == pytest.approx(
+            ship_physics.update_speed(*case)
+        ), case
+
+
+@pytest.mark.skipif(physics.np is None, reason='NumPy is not installed')
+@pytest.mark.parametrize('speed_limit, fading', LIMITS_AND_FADINGS)
+def test_update_speeds_with_numpy(speed_limit, fading):
+    check_update_speeds(speed_limit, fading)
+
+
+@pytest.mark.parametrize('speed_limit, fading', LIMITS_AND_FADINGS)
+def test_update_speeds_without_numpy(monkeypatch, speed_limit, fading):
+    monkeypatch.setattr(physics, 'np', None)
+    check_update_speeds(speed_limit, fading)
+
+
+def test_ship_physics_rejects_wrong_arguments():
+    with pytest.raises(ValueError):
+        ShipPhysics(fading=1.5)
+    with pytest.raises(ValueError):
+        ShipPhysics(row_speed_limit=0)
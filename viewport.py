@@ -0,0 +1,46 @@
+class Viewport:
+    """Size of the screen shared by game coroutines.
+
+    Coroutines read the size from attributes instead of calling
+    `getmaxyx` every tick. A new size, e.g. from a SIGWINCH handler, is
+    only requested, `update` applies it once per tick before coroutines
+    run and calls listeners, so the layout never changes in the middle
+    of a tick.
+    """
+
+    def __init__(self, rows_number, columns_number):
+        # functions called with the viewport and the previous size
+        # (rows_number, columns_number) when the size changes
+        self.listeners = []
+        self._requested_size = None
+        self._set_size(rows_number, columns_number)
+
+    def _set_size(self, rows_number, columns_number):
+        self.rows_number = rows_number
+        self.columns_number = columns_number
+        self.max_row = rows_number - 1
+        self.max_column = columns_number - 1
+        self.central_row = self.max_row // 2
+        self.central_column = self.max_column // 2
+
+    def get_size(self):
+        return self.rows_number, self.columns_number
+
+    def request_resize(self, rows_number, columns_number):
+        """Ask to resize on the next update, safe in a signal handler."""
+
+        self._requested_size = rows_number, columns_number
+
+    def update(self):
+        """Apply the requested size, return True if the size has changed."""
+
+        requested_size = self._requested_size
+        self._requested_size = None
+        if requested_size is None or requested_size == self.get_size():
+            return False
+
+        previous_size = self.get_size()
+        self._set_size(*requested_size)
+        for listener in self.listeners:
+            listener(self, previous_size)
+        return True
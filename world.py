@@ -0,0 +1,313 @@
+"""State of a game, live and saved to a compact binary snapshot.
+
+A `World` keeps everything a game changes between tics: the scenario and
+its year, spaceships, garbage, shots, explosions, stars and random
+numbers. Coroutines of `game` read and change the world they are given,
+so several worlds live in one process, e.g. a world forked from
+a snapshot of another one for a what-if run.
+
+Game coroutines keep their own state in suspended frames, which can't be
+saved. A snapshot keeps the world instead, along with the tick and cells
+of the screen layers, and `game.draw` rebuilds coroutines from it, so the
+restored game goes on exactly as the saved one would.
+
+A snapshot is a magic, the format version and the zlib-compressed JSON
+of the world, so loading a snapshot runs no code of its own.
+"""
+import json
+import random
+import zlib
+
+from batch_simulation import BatchSimulation
+from explosion import Explosions
+from game_scenario import (
+    DEFAULT_SCENARIO_PATH,
+    decode_scenario_path,
+    encode_scenario_path,
+    get_scenario_checksum,
+    has_scenario_changed,
+    load_scenario,
+)
+from obstacles import Obstacle
+from pools import Pool
+from projectiles import Projectiles
+from spatial_grid import SpatialGrid
+from starfield import Starfield
+
+SNAPSHOT_MAGIC = b'SPACESNAP'
+# 4: the world is saved as a dict along with the next uid of obstacles
+SNAPSHOT_VERSION = 4
+
+
+class Spaceship:
+    """Spaceship state: position, speed and the frame shown."""
+
+    __slots__ = (
+        'row',
+        'column',
+        'row_speed',
+        'column_speed',
+        'frame_number',
+        'crashed',
+    )
+
+    def __init__(
+        self,
+        row,
+        column,
+        row_speed=0,
+        column_speed=0,
+        frame_number=0,
+        crashed=False
+    ):
+        self.row = row
+        self.column = column
+        self.row_speed = row_speed
+        self.column_speed = column_speed
+        self.frame_number = frame_number
+        self.crashed = crashed
+
+    def dump(self):
+        return (
+            self.row,
+            self.column,
+            self.row_speed,
+            self.column_speed,
+            self.frame_number,
+            self.crashed,
+        )
+
+
+class World:
+    """Live state of a game.
+
+    scenario_path — file of the scenario, see game_scenario.py.
+    seed — seed of random numbers of the world, None — a random one.
+    year — the first year of the game.
+    stress_shots, keep_flying — arguments of `game.draw` of the game.
+    batch — garbage and shots are moved by the batch simulation,
+    a world with it is not saved.
+    """
+
+    def __init__(
+        self,
+        scenario_path=DEFAULT_SCENARIO_PATH,
+        seed=None,
+        year=1957,
+        stress_shots=0,
+        keep_flying=False,
+        batch=False
+    ):
+        self.scenario_path = scenario_path
+        # the file is read once, the scenario of the game is saved
+        self.scenario_checksum = get_scenario_checksum(scenario_path)
+        self.scenario = load_scenario(scenario_path)
+        self.stress_shots = stress_shots
+        self.keep_flying = keep_flying
+        self.random = random.Random(seed)
+        self.year = year
+        self.year_settings = self.scenario.get_year_settings(year)
+        # functions called with settings of a new year when the year changes
+        self.year_listeners = []
+        # None — the first year is counted from the first tick
+        self.next_year_tick = None
+        self.next_garbage_tick = 0
+        self.game_stats = {'game_over_tick': -1, 'shots': 0, 'destroyed': 0}
+        self.spaceships = []
+        self.obstacles = {}
+        # uid of a garbage obstacle — frame id and speed of the garbage
+        self.garbage_params = {}
+        self.next_obstacle_uid = 0
+        self.obstacles_grid = SpatialGrid()
+        self.obstacles_pool = Pool(Obstacle)
+        self.projectiles = Projectiles()
+        self.explosions = Explosions()
+        self.starfield = Starfield()
+        self.batch_simulation = BatchSimulation() if batch else None
+
+    def change_year(self, year):
+        """Set the year and push its settings of the scenario to listeners."""
+
+        self.year = year
+        self.year_settings = self.scenario.get_year_settings(year)
+        for listener in self.year_listeners:
+            listener(self.year_settings)
+
+    def add_garbage(
+        self,
+        row,
+        column,
+        rows_size,
+        columns_size,
+        frame_id,
+        speed,
+        uid=None
+    ):
+        """Register an obstacle of garbage, return the obstacle.
+
+        frame_id — group name and index of the frame, kept for snapshots.
+        uid — uid of restored garbage, the next one by default.
+        """
+        if uid is None:
+            uid = self.next_obstacle_uid
+            self.next_obstacle_uid += 1
+        obstacle = self.obstacles_pool.acquire(
+            row, column, rows_size, columns_size, uid
+        )
+        self.obstacles[uid] = obstacle
+        self.garbage_params[uid] = frame_id, speed
+        self.obstacles_grid.add(obstacle)
+        return obstacle
+
+    def remove_garbage(self, obstacle):
+        del self.obstacles[obstacle.uid]
+        del self.garbage_params[obstacle.uid]
+        self.obstacles_grid.remove(obstacle)
+        self.obstacles_pool.release(obstacle)
+
+    def dump(self):
+        """Return the state of the world as JSON data.
+
+        garbage — tuples (uid, frame id, speed, row, column, previous row,
+        previous column, rows size, columns size, hit) in order of launch.
+        """
+        if self.batch_simulation is not None:
+            raise ValueError('Garbage of the batch simulation is not saved.')
+
+        garbage = []
+        for uid, obstacle in sorted(self.obstacles.items()):
+            frame_id, speed = self.garbage_params[uid]
+            garbage.append((
+                uid,
+                frame_id,
+                speed,
+                obstacle.row,
+                obstacle.column,
+                obstacle.previous_row,
+                obstacle.previous_column,
+                obstacle.rows_size,
+                obstacle.columns_size,
+                obstacle.hit,
+            ))
+        return {
+            'scenario_path': encode_scenario_path(self.scenario_path),
+            'scenario_checksum': self.scenario_checksum,
+            'stress_shots': self.stress_shots,
+            'keep_flying': self.keep_flying,
+            'year': self.year,
+            'next_year_tick': self.next_year_tick,
+            'next_garbage_tick': self.next_garbage_tick,
+            'game_stats': dict(self.game_stats),
+            'random_state': self.random.getstate(),
+            'spaceships': [spaceship.dump() for spaceship in self.spaceships],
+            'next_obstacle_uid': self.next_obstacle_uid,
+            'garbage': garbage,
+            'projectiles': self.projectiles.dump(),
+            'explosions': self.explosions.dump(),
+            'starfield': self.starfield.dump(),
+        }
+
+    @classmethod
+    def load(cls, state):
+        """Return the world of `dump` state. Raise ValueError if its
+        scenario file is missing or has changed since."""
+
+        scenario_path = decode_scenario_path(state['scenario_path'])
+        if has_scenario_changed(scenario_path, state['scenario_checksum']):
+            raise ValueError(
+                f'Scenario {scenario_path} of the snapshot is missing '
+                'or has changed since the game was saved.'
+            )
+        world = cls(
+            scenario_path,
+            year=state['year'],
+            stress_shots=state['stress_shots'],
+            keep_flying=state['keep_flying'],
+        )
+        world.next_year_tick = state['next_year_tick']
+        world.next_garbage_tick = state['next_garbage_tick']
+        world.game_stats.update(state['game_stats'])
+        # JSON has no tuples
+        version, internal_state, gauss_next = state['random_state']
+        world.random.setstate((version, tuple(internal_state), gauss_next))
+        world.spaceships = [
+            Spaceship(*spaceship) for spaceship in state['spaceships']
+        ]
+        for (
+            uid,
+            frame_id,
+            speed,
+            row,
+            column,
+            previous_row,
+            previous_column,
+            rows_size,
+            columns_size,
+            hit,
+        ) in state['garbage']:
+            obstacle = world.add_garbage(
+                row, column, rows_size, columns_size, tuple(frame_id), speed,
+                uid,
+            )
+            obstacle.previous_row = previous_row
+            obstacle.previous_column = previous_column
+            obstacle.hit = hit
+        world.next_obstacle_uid = state['next_obstacle_uid']
+        world.projectiles.load(state['projectiles'])
+        world.explosions.load(state['explosions'])
+        world.starfield.load(state['starfield'])
+        return world
+
+
+class Snapshot:
+    """Saved game: the world, the tick it has been saved after, rows and
+    columns of the screen and cells of the screen layers, see `Compositor`.
+    """
+
+    __slots__ = ('world', 'tick', 'size', 'layers_cells')
+
+    def __init__(self, world, tick, size, layers_cells):
+        self.world = world
+        self.tick = tick
+        self.size = size
+        self.layers_cells = layers_cells
+
+
+def dump_snapshot(snapshot):
+    """Return bytes of the snapshot."""
+
+    state = {
+        'world': snapshot.world.dump(),
+        'tick': snapshot.tick,
+        'size': snapshot.size,
+        'layers_cells': snapshot.layers_cells,
+    }
+    return (
+        SNAPSHOT_MAGIC
+        + bytes([SNAPSHOT_VERSION])
+        + zlib.compress(json.dumps(state).encode(), 1)
+    )
+
+
+def load_snapshot(snapshot):
+    """Return the `Snapshot` of bytes, its world is a new one."""
+
+    header_size = len(SNAPSHOT_MAGIC) + 1
+    if not snapshot.startswith(SNAPSHOT_MAGIC):
+        raise ValueError('It is not a snapshot of the game.')
+    version = snapshot[header_size - 1]
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f'Snapshot version {version} is not supported.')
+    try:
+        state = json.loads(zlib.decompress(snapshot[header_size:]))
+    except (zlib.error, ValueError) as error:
+        raise ValueError('The snapshot is damaged.') from error
+    try:
+        return Snapshot(
+            World.load(state['world']),
+            state['tick'],
+            tuple(state['size']),
+            state['layers_cells'],
+        )
+    except (KeyError, TypeError) as error:
+        raise ValueError('The snapshot is damaged.') from error